@@ -2,10 +2,27 @@ import uvicorn
 from src.main import app
 from src.utils.config import Config
 
+def _uvicorn_perf_kwargs() -> dict:
+    """可用时启用uvloop事件循环和httptools HTTP解析器（均为C实现）"""
+    kwargs = {}
+    try:
+        import uvloop  # noqa: F401
+        kwargs["loop"] = "uvloop"
+    except ImportError:
+        pass
+    try:
+        import httptools  # noqa: F401
+        kwargs["http"] = "httptools"
+    except ImportError:
+        pass
+    return kwargs
+
 if __name__ == "__main__":
+    # 注意：reload=True时uvicorn忽略workers；生产部署应设reload=False
     uvicorn.run(
         "src.main:app",
         host=Config.API_HOST,
         port=Config.API_PORT,
-        reload=Config.API_RELOAD
-    ) 
\ No newline at end of file
+        reload=Config.API_RELOAD,
+        **_uvicorn_perf_kwargs()
+    )
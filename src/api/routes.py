@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, Body
 from pydantic import BaseModel
+from dataclasses import dataclass
 from typing import Dict, Any, Optional, List
 import subprocess
 import json
@@ -13,6 +14,7 @@ from ..core.k8s_client import KubernetesClient
 from ..core.llm_client import SuperKubectlAgent
 from ..utils.logger import get_logger
 from ..utils.config import Config
+from ..utils import fastjson
 
 logger = get_logger(__name__)
 router = APIRouter()
@@ -872,7 +874,7 @@ class OutputFormatter:
         content_type = "text"
         try:
             # 尝试解析为JSON
-            json.loads(output)
+            fastjson.loads(output)
             content_type = "json"
         except:
             try:
@@ -891,6 +893,54 @@ class OutputFormatter:
             "line_count": len(output.split('\n'))
         }
 
+@dataclass(slots=True)
+class ErrorResult:
+    """命令执行失败时的格式化结果"""
+    command: str
+    error: str
+    content: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": "error",
+            "command": self.command,
+            "error": self.error,
+            "content": self.content
+        }
+
+@dataclass(slots=True)
+class StepResult:
+    """单个步骤的执行结果记录"""
+    step: int
+    command: str
+    execution_result: Dict[str, Any]
+    formatted_result: Dict[str, Any]
+    success: bool
+    retry_count: int
+    execution_history: List[Dict[str, Any]]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "step": self.step,
+            "command": self.command,
+            "execution_result": self.execution_result,
+            "formatted_result": self.formatted_result,
+            "success": self.success,
+            "retry_count": self.retry_count,
+            "execution_history": self.execution_history
+        }
+
+def _build_error_result(command: str, exec_result: Dict[str, Any]) -> Dict[str, Any]:
+    """构造命令执行失败时的格式化结果"""
+    return ErrorResult(command, exec_result["error"], exec_result.get("output", "")).to_dict()
+
+def _build_step_result(step: int, command: str, exec_result: Dict[str, Any],
+                       formatted_result: Dict[str, Any], success: bool,
+                       retry_count: int, execution_history: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """构造单个步骤的执行结果记录"""
+    return StepResult(step, command, exec_result, formatted_result,
+                      success, retry_count, execution_history).to_dict()
+
 @router.get("/health")
 async def health_check():
     """健康检查接口"""
@@ -995,36 +1045,21 @@ async def process_query(request: QueryRequest):
                     
                     # 记录步骤结果
                     if step_success:
-                        step_results.append({
-                            "step": i + 1,
-                            "command": current_command,
-                            "execution_result": exec_result,
-                            "formatted_result": formatted_result,
-                            "success": True,
-                            "retry_count": retry_count,
-                            "execution_history": step_execution_history
-                        })
+                        step_results.append(_build_step_result(
+                            i + 1, current_command, exec_result, formatted_result,
+                            True, retry_count, step_execution_history
+                        ))
                         combined_output += f"步骤 {i+1}: {exec_result['output']}\n"
                     else:
                         # 步骤最终失败
                         all_success = False
-                        formatted_result = {
-                            "type": "error",
-                            "command": current_command,
-                            "error": exec_result["error"],
-                            "content": exec_result.get("output", "")
-                        }
-                        
-                        step_results.append({
-                            "step": i + 1,
-                            "command": current_command,
-                            "execution_result": exec_result,
-                            "formatted_result": formatted_result,
-                            "success": False,
-                            "retry_count": retry_count,
-                            "execution_history": step_execution_history
-                        })
-                        
+                        formatted_result = _build_error_result(current_command, exec_result)
+
+                        step_results.append(_build_step_result(
+                            i + 1, current_command, exec_result, formatted_result,
+                            False, retry_count, step_execution_history
+                        ))
+
                         combined_output += f"步骤 {i+1} 失败: {exec_result['error']}\n"
                         
                         # 如果某步失败，询问是否继续
@@ -1155,12 +1190,7 @@ async def process_query(request: QueryRequest):
                         retry_info = f"（经过 {retry_count} 次重试）" if retry_count > 0 else ""
                         smart_reply = f"命令执行成功{retry_info}，请查看详细结果。"
                 else:
-                    formatted_result = {
-                        "type": "error",
-                        "command": current_command,
-                        "error": exec_result["error"],
-                        "content": exec_result.get("output", "")
-                    }
+                    formatted_result = _build_error_result(current_command, exec_result)
                     retry_info = f"（已重试 {retry_count} 次）" if retry_count > 0 else ""
                     smart_reply = f"❌ 执行失败{retry_info}: {exec_result['error']}"
                 
@@ -1843,12 +1873,7 @@ async def execute_shell_command(request: ShellCommandRequest):
                 "auto"
             )
         else:
-            formatted_result = {
-                "type": "error",
-                "command": result["command"],
-                "error": result["error"],
-                "content": result.get("output", "")
-            }
+            formatted_result = _build_error_result(result["command"], result)
         
         return {
             "success": result["success"],
@@ -12,6 +12,19 @@ from ..utils.config import Config
 
 logger = get_logger(__name__)
 
+# 预先拼好脚本模板，每次执行只需填入命令本身
+_SCRIPT_TEMPLATE = "\n".join([
+    "#!/bin/bash",
+    "set -e",  # 遇到错误立即退出
+    "set -o pipefail",  # 管道中任何命令失败都会导致整个管道失败
+    "",
+    "# 设置环境变量",
+    "export KUBECONFIG=${{KUBECONFIG:-~/.kube/config}}",
+    "",
+    "# 执行命令",
+    "{command}"
+])
+
 class AdvancedShellExecutor:
     """高级Shell执行器 - 支持复杂shell语法、脚本执行和任务中断"""
     
@@ -211,19 +224,7 @@ class AdvancedShellExecutor:
     
     def _prepare_script(self, command: str) -> str:
         """准备执行脚本"""
-        script_lines = [
-            "#!/bin/bash",
-            "set -e",  # 遇到错误立即退出
-            "set -o pipefail",  # 管道中任何命令失败都会导致整个管道失败
-            "",
-            "# 设置环境变量",
-            "export KUBECONFIG=${KUBECONFIG:-~/.kube/config}",
-            "",
-            "# 执行命令",
-            command
-        ]
-        
-        return "\n".join(script_lines)
+        return _SCRIPT_TEMPLATE.format(command=command)
     
     async def execute_script(self, script_content: str, task_id: Optional[str] = None,
                            timeout: int = 600, check_cancelled_callback=None) -> Dict[str, Any]:
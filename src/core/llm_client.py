@@ -1,23 +1,421 @@
 from typing import Dict, Any
+import asyncio
+import functools
 import json
+import logging
 import os
 import re
-import traceback
+import sys
+import time
 from ..utils.logger import get_logger
 from ..utils.config import Config
+from ..utils import fastjson
 
 logger = get_logger(__name__)
 
-# 尝试导入 OpenAI 客户端，如果失败则提供一个备用实现
+# 尝试导入 pyahocorasick 多模式匹配库，不可用时退回正则扫描
 try:
-    from openai import OpenAI
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    ahocorasick = None
+    HAS_AHOCORASICK = False
+
+# 智能回复批量合并配置：在一个短窗口内收集并发请求，合并为一次LLM调用
+_REPLY_BATCH_WINDOW = 0.02  # 秒
+_REPLY_BATCH_MAX = 8
+_REPLY_BATCH_CHAR_BUDGET = 12000  # 合并请求的总字符预算，避免token超限
+_REPLY_SEPARATOR = "\n===REPLY_SEPARATOR===\n"
+_REPLY_WORKER_IDLE = 1.0  # 队列空闲超过该秒数worker自行退出，不常驻事件循环
+
+# 合并队列按事件循环共享（与_CLIENT_CACHE同理）：agent实例是每个请求
+# 新建的，实例级队列永远凑不满批；模块级注册表让并发请求真正合并
+_REPLY_BATCHERS: Dict[int, tuple] = {}  # id(loop) -> (queue, worker_task, loop)
+
+# 智能回复的响应级缓存：相同(查询,命令,输出)在短时间内直接复用上次回复
+_REPLY_CACHE_TTL = 300  # 秒
+_REPLY_CACHE_MAX = 1024
+_reply_cache: Dict[tuple, tuple] = {}  # key -> (过期时间戳, 回复)
+
+# fallback响应的公共模板：每次返回只做浅合并，不重复构建常量键值
+_FALLBACK_TEMPLATE = {
+    "success": True,
+    "tool_name": "kubectl_command"
+}
+
+# fallback文案的固定片段：拼接时复用常量字符串，避免每次调用重新格式化
+# 显式intern，保证非ASCII常量在所有响应间共享同一份对象
+_KW_EXPLANATION_PREFIX = sys.intern("基于关键词'")
+_KW_EXPLANATION_SUFFIX = sys.intern("'生成的命令")
+_KW_ANALYSIS_PREFIX = sys.intern("根据查询中的关键词'")
+_KW_ANALYSIS_SUFFIX = sys.intern("'推测用户想要执行的操作")
+_DEFAULT_ANALYSIS_PREFIX = sys.intern("无法准确解析查询，返回默认命令。错误信息: ")
+
+# fallback响应中反复出现的固定文案
+_MSG_DELETE_NS_EXPLANATION = sys.intern("批量删除所有以'a'开头的命名空间")
+_MSG_DELETE_NS_COMMAND = sys.intern(
+    "kubectl get namespace -o name | grep '^namespace/a' | cut -d'/' -f2 | xargs kubectl delete namespace"
+)
+_MSG_DELETE_NS_VERIFY = sys.intern("kubectl get namespace | grep '^a'")
+
+# 预编译正则：模块加载时编译一次，热路径上只剩C层的Pattern.search
+_JSON_BLOCK_RE = re.compile(r'```json\s*(.*?)\s*```', re.DOTALL)
+_KUBECTL_PATTERNS = [
+    re.compile(p, re.IGNORECASE) for p in (
+        r'kubectl\s+(.+?)(?:\n|$)',
+        r'`kubectl\s+(.+?)`',
+        r'"kubectl\s+(.+?)"',
+        r'命令[：:]\s*kubectl\s+(.+?)(?:\n|$)',
+        r'执行[：:]\s*kubectl\s+(.+?)(?:\n|$)'
+    )
+]
+_NS_NOT_FOUND_RE = re.compile(r'namespaces?\s+["\']([^"\']+)["\']?\s+not found', re.IGNORECASE)
+
+# fallback关键词表：按优先级排列，匹配时一次C层扫描代替逐个子串遍历
+_DELETE_RE = re.compile("|".join(map(re.escape, ("删除", "移除", "清除", "delete", "remove", "清理"))))
+_KEYWORD_COMMANDS = {
+    "pod": "kubectl get pods --all-namespaces -o wide",
+    "deployment": "kubectl get deployments --all-namespaces",
+    "service": "kubectl get services --all-namespaces",
+    "node": "kubectl get nodes -o wide",
+    "namespace": "kubectl get namespace",
+    "命名空间": "kubectl get namespace",
+    "日志": "kubectl logs",
+    "log": "kubectl logs",
+    "describe": "kubectl describe",
+    "详情": "kubectl describe",
+    "状态": "kubectl get pods --all-namespaces",
+    "集群": "kubectl cluster-info",
+    "版本": "kubectl version",
+    "事件": "kubectl get events --all-namespaces",
+    "配置": "kubectl get configmaps --all-namespaces"
+}
+_KEYWORD_RE = re.compile("|".join(map(re.escape, _KEYWORD_COMMANDS)))
+
+# 可用时预构建Aho-Corasick自动机：对任意多关键词保持O(len(query))单次扫描
+if HAS_AHOCORASICK:
+    _KW_AUTOMATON = ahocorasick.Automaton()
+    for _kw in _KEYWORD_COMMANDS:
+        _KW_AUTOMATON.add_word(_kw, _kw)
+    _KW_AUTOMATON.make_automaton()
+else:
+    _KW_AUTOMATON = None
+
+def _find_keywords(query_lower: str) -> set:
+    """单次扫描找出查询中出现的所有命令关键词"""
+    if _KW_AUTOMATON is not None:
+        return {kw for _, kw in _KW_AUTOMATON.iter(query_lower)}
+    return set(_KEYWORD_RE.findall(query_lower))
+
+# 按首个动词判定表格输出的kubectl子命令
+_TABLE_VERBS = frozenset({"get", "list", "top"})
+
+# 错误分类正则：每类判定从多个Python级子串测试收敛为一次C层扫描
+_NOT_FOUND_RE = re.compile(r"not ?found")
+_EXISTS_RE = re.compile(r"already ?exists")
+_FORBIDDEN_RE = re.compile(r"forbidden|unauthorized")
+_NETWORK_RE = re.compile(r"timeout|connection|network|temporary")
+
+# 静态系统提示词：内容与具体请求无关，模块加载时构建一次
+_SMART_REPLY_SYSTEM_PROMPT = """你是一个Kubernetes专家AI助手。用户提出了一个问题，系统执行了相应的kubectl命令（可能包含重试）并获得了结果。
+
+你的任务是：
+1. 分析用户的原始问题
+2. 理解kubectl命令的执行结果
+3. 针对用户的具体问题给出直接、准确的回答
+4. 如果有重试过程，要特别说明重试的情况和最终结果
+5. 提供有用的统计信息和洞察
+
+回复要求：
+- 直接回答用户的问题
+- 提供具体的数字统计
+- 如果有异常情况，要指出来
+- 如果有重试过程，要说明重试的原因和结果
+- 语言要简洁明了，专业但易懂
+- 不要重复显示原始数据，专注于分析和回答
+
+重试信息处理：
+- 如果命令经过重试才成功，要说明这一点
+- 解释为什么需要重试以及AI是如何修复问题的
+- 强调最终的成功结果
+
+删除操作特殊处理：
+- 如果是删除操作，要特别关注删除的结果
+- 如果删除目标不存在（NotFound错误），应该说明这实际上意味着删除操作达到了预期效果
+- 区分"删除成功"和"删除目标已经不存在"两种情况
+- 对于删除操作，要明确说明最终的状态
+
+示例：
+用户问："删除nginx命名空间"
+如果返回"namespace not found"，你应该回答："✅ 删除操作达到预期效果。nginx命名空间不存在，说明删除目标已经不存在，删除操作的目的已经达到。"
+
+用户问："创建一个namespace"
+如果第一次失败但重试成功，你应该回答："✅ 成功创建了命名空间。虽然初次尝试遇到了一些问题，但AI自动分析错误并调整了命令，最终成功完成了创建操作。"
+"""
+
+_ERROR_RETRY_SYSTEM_PROMPT = """你是一个Kubernetes专家AI助手，专门负责分析kubectl命令执行错误并提供修复建议。
+
+你的任务是：
+1. 分析kubectl命令执行失败的原因
+2. 根据错误信息判断是否可以通过修改命令来修复
+3. 如果可以修复，生成一个新的kubectl命令（可以包含shell语法）
+4. 提供修复的原因说明
+
+常见错误类型和修复策略：
+1. 资源已存在错误 (AlreadyExists) - 可以改用get命令查看或使用--dry-run
+2. 权限不足错误 (Forbidden) - 检查RBAC权限，可能需要不同的命名空间
+3. 资源不存在错误 (NotFound) - 检查资源名称、命名空间是否正确，可能需要先创建依赖资源
+4. 语法错误 (Invalid) - 修正命令参数格式，可以使用shell语法来简化复杂操作
+5. 网络连接错误 - 可能是临时问题，建议重试相同命令
+6. 资源配额不足 - 可以尝试创建更小的资源或检查配额
+
+**重要规则 - 删除操作特殊处理：**
+- 如果原始命令是删除操作（delete），绝对不要改成查看操作（get、describe等）
+- 删除操作失败时，应该：
+  1. 如果是"资源不存在"错误，说明删除目标已经不存在，可以认为删除成功
+  2. 如果是"命名空间不存在"错误，说明整个命名空间都不存在，删除目标自然也不存在
+  3. 如果是权限问题，不要改变操作类型，而是标记为无法重试
+  4. 如果是语法错误，修正语法但保持删除操作，可以使用shell语法来简化
+- 删除操作的重试命令必须仍然是删除操作，不能改成其他操作类型
+
+其他重要规则：
+- 只返回JSON，不要包含任何其他文字
+- **支持shell语法**：可以使用管道（|）、xargs、grep等来实现复杂操作
+- 优先使用可执行的命令，不要只给建议
+- 如果是权限问题，不要建议提升权限，而是建议使用允许的操作
+- 对于复杂的批量操作，优先使用shell语法组合命令
+
+返回的JSON必须严格按照以下格式：
+{
+    "success": true/false,
+    "can_retry": true/false,
+    "retry_command": "修复后的命令",
+    "retry_reason": "为什么这样修复的原因",
+    "error_analysis": "对错误的详细分析",
+    "confidence": "high/medium/low - 修复成功的信心程度"
+}
+
+如果无法修复，返回：
+{
+    "success": false,
+    "can_retry": false,
+    "error": "无法修复的原因",
+    "error_analysis": "对错误的详细分析"
+}
+
+示例1 - 命名空间不存在（创建依赖）：
+错误: "namespaces \"test\" not found"
+失败命令: "kubectl create deployment nginx --image=nginx --namespace=test"
+正确返回:
+{
+    "success": true,
+    "can_retry": true,
+    "retry_command": "kubectl create namespace test",
+    "retry_reason": "需要先创建命名空间test，然后再创建deployment",
+    "error_analysis": "命名空间test不存在，需要先创建",
+    "confidence": "high"
+}
+
+示例2 - 资源已存在：
+错误: "namespaces \"default\" already exists"
+失败命令: "kubectl create namespace default"
+正确返回:
+{
+    "success": true,
+    "can_retry": true,
+    "retry_command": "kubectl get namespace default",
+    "retry_reason": "命名空间已存在，改为查看现有命名空间",
+    "error_analysis": "命名空间default已经存在",
+    "confidence": "high"
+}
+
+示例3 - 批量删除语法错误（使用shell语法修复）：
+错误: "error: there is no need to specify a resource type as a separate argument when passing arguments in resource/name form"
+失败命令: "kubectl get namespaces -o name | grep '^namespace/a' | xargs kubectl delete"
+正确返回:
+{
+    "success": true,
+    "can_retry": true,
+    "retry_command": "kubectl get namespace -o name | grep '^namespace/a' | cut -d'/' -f2 | xargs kubectl delete namespace",
+    "retry_reason": "修复shell管道命令的语法错误，使用cut命令提取命名空间名称，避免资源类型重复指定",
+    "error_analysis": "原命令在xargs传递参数时出现资源类型重复指定的问题，使用cut命令提取纯命名空间名称可以解决",
+    "confidence": "high"
+}"""
+
+def _extract_first_json(s: str):
+    """从文本中提取第一个合法的JSON对象
+
+    raw_decode在首个完整JSON值处停止，无需```json围栏，
+    也避免了异常驱动的整串解析回退。找不到时返回None。
+    """
+    decoder = json.JSONDecoder()
+    i = s.find("{")
+    while i != -1:
+        try:
+            obj, _ = decoder.raw_decode(s, i)
+            return obj
+        except ValueError:
+            i = s.find("{", i + 1)
+    return None
+
+def _stats_bucket(query_lower: str, rtype: str) -> str:
+    """按结果类型把查询归一化为统计口径桶，作为基础统计回复的缓存键
+
+    分桶顺序必须与各结果类型原有的if/elif判定保持一致：text类型只看
+    describe/log，table类型才区分资源种类；合成一个全局顺序会让
+    node/service/deployment遮蔽text结果的describe/log口径。
+    """
+    if rtype == 'text':
+        if 'describe' in query_lower:
+            return 'describe'
+        if 'log' in query_lower or '日志' in query_lower:
+            return 'log'
+        return 'generic'
+    if rtype == 'table':
+        if 'pod' in query_lower and '多少' in query_lower:
+            return 'pod_count'
+        if 'node' in query_lower or '节点' in query_lower:
+            return 'node'
+        if 'service' in query_lower or '服务' in query_lower:
+            return 'service'
+        if 'deployment' in query_lower:
+            return 'deployment'
+    return 'generic'
+
+# 表格口径桶对应的回复模板：查表代替if/elif链
+_TABLE_BUCKET_TEMPLATES = {
+    'pod_count': "根据查询结果，集群中总共有 {rows} 个Pod{retry}。",
+    'node': "集群中总共有 {rows} 个节点{retry}。",
+    'service': "集群中总共有 {rows} 个服务{retry}。",
+    'deployment': "集群中总共有 {rows} 个Deployment{retry}。"
+}
+
+def _stats_table_reply(bucket, total_rows, header_count, line_count,
+                       step_total, step_success, retry_info):
+    template = _TABLE_BUCKET_TEMPLATES.get(bucket)
+    if template is not None:
+        return template.format(rows=total_rows, retry=retry_info)
+    return f"查询结果包含 {total_rows} 条记录，共 {header_count} 个字段{retry_info}。"
+
+def _stats_text_reply(bucket, total_rows, header_count, line_count,
+                      step_total, step_success, retry_info):
+    if bucket == 'describe':
+        return f"已获取详细信息，包含 {line_count} 行详细配置和状态信息{retry_info}。"
+    elif bucket == 'log':
+        return f"已获取日志信息，共 {line_count} 行日志记录{retry_info}。"
+    return f"命令执行成功，返回了 {line_count} 行信息{retry_info}。"
+
+def _stats_multi_reply(bucket, total_rows, header_count, line_count,
+                       step_total, step_success, retry_info):
+    if step_success == step_total:
+        return f"✅ 成功完成所有 {step_total} 个步骤{retry_info}。"
+    return f"⚠️ 完成了 {step_total} 个步骤中的 {step_success} 个{retry_info}。"
+
+def _stats_default_reply(bucket, total_rows, header_count, line_count,
+                         step_total, step_success, retry_info):
+    return f"命令执行成功{retry_info}，请查看详细结果。"
+
+# 结果类型到统计回复生成器的派发表
+_STATS_TYPE_HANDLERS = {
+    'table': _stats_table_reply,
+    'text': _stats_text_reply,
+    'multi_step': _stats_multi_reply
+}
+
+@functools.lru_cache(maxsize=1024)
+def _basic_stats_with_retry_reply(bucket: str, rtype: str, total_rows: int, header_count: int,
+                                  line_count: int, step_total: int, step_success: int,
+                                  total_retries: int) -> str:
+    """按归一化键生成基础统计回复（入参全部可哈希，结果可安全缓存）"""
+    retry_info = f"（经过 {total_retries} 次智能重试）" if total_retries > 0 else ""
+    handler = _STATS_TYPE_HANDLERS.get(rtype, _stats_default_reply)
+    return handler(bucket, total_rows, header_count, line_count,
+                   step_total, step_success, retry_info)
+
+def _reply_cache_get(key: tuple):
+    """取未过期的缓存回复，没有则返回None"""
+    entry = _reply_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, reply = entry
+    if time.monotonic() > expires_at:
+        _reply_cache.pop(key, None)
+        return None
+    return reply
+
+def _reply_cache_put(key: tuple, reply: str):
+    """写入缓存回复，超出容量时先清理过期项再整体淘汰"""
+    if len(_reply_cache) >= _REPLY_CACHE_MAX:
+        now = time.monotonic()
+        for k in [k for k, (exp, _) in _reply_cache.items() if exp < now]:
+            _reply_cache.pop(k, None)
+        if len(_reply_cache) >= _REPLY_CACHE_MAX:
+            _reply_cache.clear()
+    _reply_cache[key] = (time.monotonic() + _REPLY_CACHE_TTL, reply)
+
+def _tally_steps(steps: list) -> tuple:
+    """单次遍历统计步骤列表，返回(总重试次数, 成功数, 失败数)"""
+    total_retries = success = fail = 0
+    for step in steps:
+        total_retries += step.get("retry_count", 0)
+        if step.get("success", False):
+            success += 1
+        if not step.get("success", True):
+            fail += 1
+    return total_retries, success, fail
+
+def _parse_llm_json(content: str):
+    """解析LLM响应中的JSON对象（analyze与错误分析共用），找不到时返回None"""
+    json_match = _JSON_BLOCK_RE.search(content)
+    if json_match:
+        try:
+            return fastjson.loads(json_match.group(1))
+        except ValueError:
+            pass
+    return _extract_first_json(content)
+
+def _truncate(text: str, limit: int) -> str:
+    """截断文本；长度未超限时直接返回原对象，避免额外分配"""
+    return text if len(text) <= limit else text[:limit]
+
+def _make_fallback(command: str, output_format: str, explanation: str,
+                   analysis: str, steps=None) -> Dict:
+    """构建fallback响应：所有分支共用同一份结构，避免字面量漂移"""
+    parameters = {
+        "command": command,
+        "output_format": output_format,
+        "explanation": explanation
+    }
+    if steps:
+        parameters["steps"] = steps
+    return {
+        **_FALLBACK_TEMPLATE,
+        "parameters": parameters,
+        "analysis": analysis
+    }
+
+@functools.lru_cache(maxsize=128)
+def _keyword_fallback_response(keyword: str, command: str) -> Dict:
+    """构建关键词匹配的fallback响应（关键词集合有限，结果可安全缓存）"""
+    output_format = "table" if command.startswith("kubectl") else "text"
+    return _make_fallback(
+        command, output_format,
+        _KW_EXPLANATION_PREFIX + keyword + _KW_EXPLANATION_SUFFIX,
+        _KW_ANALYSIS_PREFIX + keyword + _KW_ANALYSIS_SUFFIX
+    )
+
+# 尝试导入 OpenAI 异步客户端，如果失败则提供一个备用实现
+try:
+    import httpx
+    from openai import AsyncOpenAI
     HAS_OPENAI = True
 except ImportError:
     logger.warning("未找到OpenAI包，将使用内部模拟实现")
     HAS_OPENAI = False
-    
-    # 创建一个模拟的OpenAI类，避免导入错误
-    class OpenAI:
+    httpx = None
+
+    # 创建一个模拟的AsyncOpenAI类，避免导入错误
+    class AsyncOpenAI:
         def __init__(self, **kwargs):
             self.api_key = kwargs.get("api_key")
             self.base_url = kwargs.get("base_url")
@@ -27,86 +425,36 @@ except ImportError:
                 })
             })
 
-class SuperKubectlAgent:
-    """超强Kubectl AI Agent - 能够理解和执行任意kubectl命令"""
-    
-    def __init__(self):
-        try:
-            # 获取混元配置
-            self.hunyuan_config = Config.get_hunyuan_config()
-            self.api_key = self.hunyuan_config["api_key"]
-            self.secret_key = self.hunyuan_config["secret_key"]
-        except Exception as e:
-            logger.warning(f"初始化混元配置失败: {str(e)}，将使用测试密钥")
-            self.api_key = "test_api_key"
-            self.secret_key = "test_secret_key"
-        
-        # 定义kubectl命令类别和常用操作
-        self.kubectl_categories = {
-            "资源查看": [
-                "get pods", "get deployments", "get services", "get nodes", 
-                "get namespaces", "get configmaps", "get secrets", "get ingress",
-                "get pv", "get pvc", "get events", "get all"
-            ],
-            "资源详情": [
-                "describe pod", "describe deployment", "describe service", 
-                "describe node", "describe namespace", "describe ingress"
-            ],
-            "日志查看": [
-                "logs", "logs -f", "logs --tail=100", "logs --since=1h"
-            ],
-            "资源操作": [
-                "apply -f", "delete", "create", "edit", "patch", "scale"
-            ],
-            "集群管理": [
-                "cluster-info", "top nodes", "top pods", "version", "api-resources"
-            ],
-            "调试工具": [
-                "exec -it", "port-forward", "proxy", "cp"
-            ]
-        }
-        
-        # 初始化 OpenAI 客户端（如果可用）
-        if HAS_OPENAI:
-            try:
-                self.client = OpenAI(
-                    api_key=self.api_key,
-                    base_url="https://api.hunyuan.cloud.tencent.com/v1"
-                )
-            except Exception as e:
-                logger.error(f"初始化OpenAI客户端失败: {str(e)}")
-                self.client = None
-        else:
-            self.client = None
-            logger.warning("OpenAI客户端未初始化，LLM功能将不可用")
+# kubectl命令类别和常用操作（静态，模块级折叠）
+_KUBECTL_CATEGORIES = {
+        "资源查看": [
+            "get pods", "get deployments", "get services", "get nodes", 
+            "get namespaces", "get configmaps", "get secrets", "get ingress",
+            "get pv", "get pvc", "get events", "get all"
+        ],
+        "资源详情": [
+            "describe pod", "describe deployment", "describe service", 
+            "describe node", "describe namespace", "describe ingress"
+        ],
+        "日志查看": [
+            "logs", "logs -f", "logs --tail=100", "logs --since=1h"
+        ],
+        "资源操作": [
+            "apply -f", "delete", "create", "edit", "patch", "scale"
+        ],
+        "集群管理": [
+            "cluster-info", "top nodes", "top pods", "version", "api-resources"
+        ],
+        "调试工具": [
+            "exec -it", "port-forward", "proxy", "cp"
+        ]
+}
 
-    async def analyze_query(self, query: str, context: Dict[str, Any] = None) -> Dict:
-        """
-        分析用户查询并生成kubectl命令和输出格式建议
-        
-        Args:
-            query: 用户查询
-            context: 上下文信息
-            
-        Returns:
-            Dict: 包含命令、参数和格式化建议的分析结果
-        """
-        try:
-            # 检查客户端是否可用
-            if not HAS_OPENAI or not self.client:
-                logger.warning("LLM客户端不可用，返回手动响应")
-                return {
-                    "success": True,
-                    "tool_name": "kubectl_command",
-                    "parameters": {
-                        "command": "kubectl get pods --all-namespaces -o wide",
-                        "output_format": "table"
-                    },
-                    "analysis": "LLM服务不可用，返回默认命令"
-                }
-                
-            # 构造系统提示词
-            system_prompt = f"""你是一个Kubernetes专家AI助手。你需要分析用户的查询，并返回结构化的JSON响应。
+# 类别JSON采用紧凑分隔符：比indent=2小约40%，直接减少上游模型需要解码的token数
+_KUBECTL_CATEGORIES_JSON = fastjson.dumps_str(_KUBECTL_CATEGORIES)
+
+# 分析提示词在导入时折叠为常量：输入全部是静态数据
+_ANALYZE_SYSTEM_PROMPT = f"""你是一个Kubernetes专家AI助手。你需要分析用户的查询，并返回结构化的JSON响应。
 
 你的任务是：
 1. 理解用户的Kubernetes相关问题
@@ -115,7 +463,7 @@ class SuperKubectlAgent:
 4. 提供简要的分析说明
 
 可用的kubectl命令类别：
-{json.dumps(self.kubectl_categories, ensure_ascii=False, indent=2)}
+{_KUBECTL_CATEGORIES_JSON}
 
 输出格式选择：
 - "table": 适合列表数据，如pods、services、deployments等
@@ -195,208 +543,273 @@ class SuperKubectlAgent:
 - **支持shell语法**：可以使用管道、grep、xargs等来实现复杂操作
 - 如果是危险操作，在explanation中给出警告
 - 删除操作自动添加验证步骤"""
+
+_HUNYUAN_BASE_URL = "https://api.hunyuan.cloud.tencent.com/v1"
+
+# 按(api_key, base_url)复用AsyncOpenAI实例：所有agent共享同一个httpx连接池，
+# keep-alive连接才能跨请求复用（agent在请求处理路径上是逐次创建的）
+_CLIENT_CACHE: Dict[tuple, "AsyncOpenAI"] = {}
+
+class SuperKubectlAgent:
+    """超强Kubectl AI Agent - 能够理解和执行任意kubectl命令"""
+    
+    def __init__(self):
+        try:
+            # 获取混元配置
+            self.hunyuan_config = Config.get_hunyuan_config()
+            self.api_key = self.hunyuan_config["api_key"]
+            self.secret_key = self.hunyuan_config["secret_key"]
+        except Exception as e:
+            logger.warning(f"初始化混元配置失败: {str(e)}，将使用测试密钥")
+            self.api_key = "test_api_key"
+            self.secret_key = "test_secret_key"
+        
+        # kubectl命令类别引用模块级常量（保持属性兼容）
+        self.kubectl_categories = _KUBECTL_CATEGORIES
+        
+        # 初始化异步 OpenAI 客户端（如果可用），同一份密钥的实例在进程内共享
+        if HAS_OPENAI:
+            try:
+                self.client = self._get_client(self.api_key)
+            except Exception as e:
+                logger.error(f"初始化OpenAI客户端失败: {str(e)}")
+                self.client = None
+        else:
+            self.client = None
+            logger.warning("OpenAI客户端未初始化，LLM功能将不可用")
+
+        # 批量分析的并发上限：避免并发fan-out时瞬间打满API配额
+        self._sem = asyncio.Semaphore(int(os.getenv("HUNYUAN_MAX_CONCURRENCY", "16")))
+
+    @classmethod
+    def _get_client(cls, api_key: str) -> "AsyncOpenAI":
+        """获取进程级共享的AsyncOpenAI客户端
+
+        异步客户端避免在事件循环中阻塞，连接池复用keep-alive连接，
+        省去每次调用的TCP+TLS握手；按密钥缓存避免每个agent各开一个连接池。
+        """
+        timeout = Config.HUNYUAN_TIMEOUT
+        key = (api_key, _HUNYUAN_BASE_URL, timeout)
+        client = _CLIENT_CACHE.get(key)
+        if client is None:
+            client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=_HUNYUAN_BASE_URL,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=100,
+                        max_keepalive_connections=50,
+                        keepalive_expiry=60
+                    ),
+                    timeout=httpx.Timeout(timeout)
+                )
+            )
+            _CLIENT_CACHE[key] = client
+        return client
+
+    async def analyze_query(self, query: str, context: Dict[str, Any] = None) -> Dict:
+        """
+        分析用户查询并生成kubectl命令和输出格式建议
+        
+        Args:
+            query: 用户查询
+            context: 上下文信息
+            
+        Returns:
+            Dict: 包含命令、参数和格式化建议的分析结果
+        """
+        try:
+            # 检查客户端是否可用
+            if not HAS_OPENAI or not self.client:
+                logger.warning("LLM客户端不可用，返回手动响应")
+                return {
+                    **_FALLBACK_TEMPLATE,
+                    "parameters": {
+                        "command": "kubectl get pods --all-namespaces -o wide",
+                        "output_format": "table"
+                    },
+                    "analysis": "LLM服务不可用，返回默认命令"
+                }
+                
             
-            # 构造请求
+            # 构造请求（系统提示词为模块级常量）
             messages = [
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": _ANALYZE_SYSTEM_PROMPT},
                 {"role": "user", "content": f"用户查询: {query}"}
             ]
             
-            # 发送请求
-            completion = self.client.chat.completions.create(
-                model="hunyuan-turbos-latest",
-                messages=messages,
-                extra_body={
-                    "enable_enhancement": True
-                }
-            )
+            # 发送请求（流式读取，出现完整的顶层JSON后提前结束）
+            content = await self._stream_json_content(messages)
             
-            logger.info(f"混元API原始响应: {completion.model_dump_json()}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("混元API原始响应: %s", content)
             
             # 解析响应
             try:
-                content = completion.choices[0].message.content.strip()
                 
-                # 尝试从内容中提取JSON结构
-                json_match = re.search(r'```json\s*(.*?)\s*```', content, re.DOTALL)
-                if json_match:
-                    try:
-                        extracted_json = json_match.group(1)
-                        analysis = json.loads(extracted_json)
-                        return {
-                            "success": True,
-                            "tool_name": analysis.get("tool_name", "kubectl_command"),
-                            "parameters": analysis.get("parameters", {}),
-                            "analysis": analysis.get("analysis", "")
-                        }
-                    except Exception as e:
-                        logger.warning(f"解析JSON块失败: {str(e)}")
-                
-                # 尝试直接解析为JSON对象
-                try:
-                    analysis = json.loads(content)
+                # 提取首个合法JSON对象（兼容```json围栏和带前后缀文字的响应）
+                analysis = _parse_llm_json(content)
+                if isinstance(analysis, dict):
                     return {
                         "success": True,
                         "tool_name": analysis.get("tool_name", "kubectl_command"),
                         "parameters": analysis.get("parameters", {}),
                         "analysis": analysis.get("analysis", "")
                     }
-                except Exception as e:
-                    logger.warning(f"直接解析JSON失败: {str(e)}")
-                    
-                    # 智能解析fallback - 尝试从文本中提取kubectl命令
-                    kubectl_patterns = [
-                        r'kubectl\s+(.+?)(?:\n|$)',
-                        r'`kubectl\s+(.+?)`',
-                        r'"kubectl\s+(.+?)"',
-                        r'命令[：:]\s*kubectl\s+(.+?)(?:\n|$)',
-                        r'执行[：:]\s*kubectl\s+(.+?)(?:\n|$)'
-                    ]
-                    
-                    for pattern in kubectl_patterns:
-                        match = re.search(pattern, content, re.IGNORECASE)
-                        if match:
-                            command = match.group(1).strip()
-                            # 判断输出格式
-                            output_format = "table" if any(cmd in command.lower() for cmd in ["get", "list"]) else "text"
-                            
-                            return {
-                                "success": True,
-                                "tool_name": "kubectl_command",
-                                "parameters": {
-                                    "command": command,
-                                    "output_format": output_format,
-                                    "explanation": f"从AI响应中提取的kubectl命令: {command}"
-                                },
-                                "analysis": content[:200] + "..." if len(content) > 200 else content
-                            }
-                    
-                    # 最后的fallback - 基于关键词推测命令
-                    return self._generate_fallback_command(query, content)
+                logger.warning("响应中未找到JSON对象，尝试提取kubectl命令")
+                
+                # 智能解析fallback - 尝试从文本中提取kubectl命令
+                for pattern in _KUBECTL_PATTERNS:
+                    match = pattern.search(content)
+                    if match:
+                        command = match.group(1).strip()
+                        # 判断输出格式：只看首个动词，避免对整条命令做子串扫描
+                        first_token = command.lower().split(maxsplit=1)
+                        output_format = "table" if first_token and first_token[0] in _TABLE_VERBS else "text"
+                        
+                        return {
+                            "success": True,
+                            "tool_name": "kubectl_command",
+                            "parameters": {
+                                "command": command,
+                                "output_format": output_format,
+                                "explanation": f"从AI响应中提取的kubectl命令: {command}"
+                            },
+                            "analysis": content[:200] + "..." if len(content) > 200 else content
+                        }
+                
+                # 最后的fallback - 基于关键词推测命令
+                return self._generate_fallback_command(query, content)
                     
             except Exception as e:
                 logger.error(f"解析响应失败: {str(e)}, 原始内容: {content}")
                 return self._generate_fallback_command(query, str(e))
                 
         except Exception as e:
-            logger.error(f"分析查询失败: {str(e)}\n{traceback.format_exc()}")
+            logger.exception("分析查询失败: %s", e)
             return self._generate_fallback_command(query, str(e))
     
-    def _generate_fallback_command(self, query: str, error_info: str = "") -> Dict:
+    async def analyze_queries_batch(self, queries: list) -> list:
+        """
+        并发分析多个用户查询
+
+        通过asyncio.gather让多个LLM请求的网络I/O重叠，
+        并用信号量限制同时在途的请求数（HUNYUAN_MAX_CONCURRENCY，默认16）。
+
+        Args:
+            queries: 用户查询列表
+
+        Returns:
+            list: 与queries顺序一致的分析结果列表
+        """
+        async def run(query: str) -> Dict:
+            async with self._sem:
+                return await self.analyze_query(query)
+
+        results = await asyncio.gather(*(run(q) for q in queries), return_exceptions=True)
+        # 单个查询失败不影响整批：异常转换为该查询的fallback响应
+        return [
+            self._generate_fallback_command(query, str(result))
+            if isinstance(result, BaseException) else result
+            for query, result in zip(queries, results)
+        ]
+
+    async def _stream_json_content(self, messages: list) -> str:
+        """流式读取补全内容，出现完整的顶层JSON对象后提前关闭流
+
+        分析响应通常是"JSON + 尾随说明文字"的形状，提前退出省掉
+        尾部token在混元侧的解码等待。返回已strip的完整内容。
+        """
+        stream = await self.client.chat.completions.create(
+            model="hunyuan-turbos-latest",
+            messages=messages,
+            stream=True,
+            extra_body={
+                "enable_enhancement": True
+            }
+        )
+        decoder = json.JSONDecoder()
+        buf = ""
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            buf += delta
+            # 只有增量里出现'}'时才值得探测一次完整性
+            if "}" in delta:
+                start = buf.find("{")
+                if start != -1:
+                    try:
+                        decoder.raw_decode(buf, start)
+                    except ValueError:
+                        continue
+                    await stream.close()
+                    break
+        return buf.strip()
+
+    def _generate_fallback_command(self, query: str, error_info: str = "",
+                                   query_lower: str = None) -> Dict:
         """
         基于查询关键词生成fallback命令
         
         Args:
             query: 用户查询
             error_info: 错误信息
+            query_lower: 调用方已小写化的查询，避免重复分配
             
         Returns:
             Dict: fallback命令响应
         """
-        query_lower = query.lower()
-        
-        # 首先检查是否是删除操作
-        delete_keywords = ["删除", "移除", "清除", "delete", "remove", "清理"]
-        is_delete_operation = any(keyword in query_lower for keyword in delete_keywords)
+        if query_lower is None:
+            query_lower = query.lower()
         
-        if is_delete_operation:
+        # 首先检查是否是删除操作（单次扫描代替6个子串遍历）
+        if _DELETE_RE.search(query_lower):
             # 删除操作的特殊处理
             if "namespace" in query_lower or "命名空间" in query_lower:
                 if "a开头" in query_lower or "a开始" in query_lower:
                     # 删除a开头的namespace
-                    return {
-                        "success": True,
-                        "tool_name": "kubectl_command",
-                        "parameters": {
-                            "command": "kubectl get namespace -o name | grep '^namespace/a' | cut -d'/' -f2 | xargs kubectl delete namespace",
-                            "output_format": "text",
-                            "explanation": "批量删除所有以'a'开头的命名空间",
-                            "steps": [
-                                "kubectl get namespace -o name | grep '^namespace/a' | cut -d'/' -f2 | xargs kubectl delete namespace",
-                                "kubectl get namespace | grep '^a'"
-                            ]
-                        },
-                        "analysis": "用户需要批量删除所有以'a'开头的命名空间，使用shell管道命令获取符合条件的命名空间并批量删除，最后验证删除结果"
-                    }
+                    return _make_fallback(
+                        _MSG_DELETE_NS_COMMAND, "text", _MSG_DELETE_NS_EXPLANATION,
+                        "用户需要批量删除所有以'a'开头的命名空间，使用shell管道命令获取符合条件的命名空间并批量删除，最后验证删除结果",
+                        steps=[_MSG_DELETE_NS_COMMAND, _MSG_DELETE_NS_VERIFY]
+                    )
                 else:
-                    return {
-                        "success": True,
-                        "tool_name": "kubectl_command",
-                        "parameters": {
-                            "command": "kubectl delete namespace",
-                            "output_format": "text",
-                            "explanation": "删除命名空间（需要指定具体的命名空间名称）"
-                        },
-                        "analysis": "用户想要删除命名空间，但需要指定具体的命名空间名称"
-                    }
+                    return _make_fallback(
+                        "kubectl delete namespace", "text",
+                        "删除命名空间（需要指定具体的命名空间名称）",
+                        "用户想要删除命名空间，但需要指定具体的命名空间名称"
+                    )
             elif "pod" in query_lower:
-                return {
-                    "success": True,
-                    "tool_name": "kubectl_command",
-                    "parameters": {
-                        "command": "kubectl delete pod --all --all-namespaces",
-                        "output_format": "text",
-                        "explanation": "删除所有Pod"
-                    },
-                    "analysis": "用户想要删除Pod"
-                }
+                return _make_fallback(
+                    "kubectl delete pod --all --all-namespaces", "text",
+                    "删除所有Pod", "用户想要删除Pod"
+                )
             else:
-                return {
-                    "success": True,
-                    "tool_name": "kubectl_command",
-                    "parameters": {
-                        "command": "kubectl get all --all-namespaces",
-                        "output_format": "table",
-                        "explanation": "先查看所有资源，然后确定要删除的具体资源"
-                    },
-                    "analysis": "用户想要删除资源，但需要先确定具体要删除什么"
-                }
-        
-        # 非删除操作的关键词映射
-        keyword_commands = {
-            "pod": "kubectl get pods --all-namespaces -o wide",
-            "deployment": "kubectl get deployments --all-namespaces",
-            "service": "kubectl get services --all-namespaces",
-            "node": "kubectl get nodes -o wide", 
-            "namespace": "kubectl get namespace",
-            "命名空间": "kubectl get namespace",
-            "日志": "kubectl logs",
-            "log": "kubectl logs",
-            "describe": "kubectl describe",
-            "详情": "kubectl describe",
-            "状态": "kubectl get pods --all-namespaces",
-            "集群": "kubectl cluster-info",
-            "版本": "kubectl version",
-            "事件": "kubectl get events --all-namespaces",
-            "配置": "kubectl get configmaps --all-namespaces"
-        }
-        
-        # 查找匹配的关键词
-        for keyword, command in keyword_commands.items():
-            if keyword in query_lower:
-                output_format = "table" if command.startswith("kubectl") else "text"
-                return {
-                    "success": True,
-                    "tool_name": "kubectl_command",
-                    "parameters": {
-                        "command": command,
-                        "output_format": output_format,
-                        "explanation": f"基于关键词'{keyword}'生成的命令"
-                    },
-                    "analysis": f"根据查询中的关键词'{keyword}'推测用户想要执行的操作"
-                }
+                return _make_fallback(
+                    "kubectl get all --all-namespaces", "table",
+                    "先查看所有资源，然后确定要删除的具体资源",
+                    "用户想要删除资源，但需要先确定具体要删除什么"
+                )
+        
+        # 非删除操作：一次扫描找出出现的关键词，再按表序取优先级最高的
+        # （响应按关键词缓存；嵌套的parameters也要复制一份，
+        # 否则调用方改写parameters会污染进程级缓存）
+        found = _find_keywords(query_lower)
+        if found:
+            for keyword, command in _KEYWORD_COMMANDS.items():
+                if keyword in found:
+                    cached = _keyword_fallback_response(keyword, command)
+                    return {**cached, "parameters": dict(cached["parameters"])}
         
         # 默认命令
-        return {
-            "success": True,
-            "tool_name": "kubectl_command",
-            "parameters": {
-                "command": "kubectl get pods --all-namespaces",
-                "output_format": "table",
-                "explanation": "默认命令：查看所有Pod状态"
-            },
-            "analysis": f"无法准确解析查询，返回默认命令。错误信息: {error_info[:100]}"
-        }
+        return _make_fallback(
+            "kubectl get pods --all-namespaces", "table",
+            "默认命令：查看所有Pod状态",
+            _DEFAULT_ANALYSIS_PREFIX + _truncate(error_info, 100)
+        )
 
     async def generate_smart_reply(self, query: str, command: str, output: str, formatted_result: Dict[str, Any]) -> str:
         """
@@ -417,66 +830,36 @@ class SuperKubectlAgent:
                 logger.warning("LLM客户端不可用，返回基础统计")
                 return self._generate_basic_stats(query, output, formatted_result)
             
-            # 构造智能回复的系统提示词
-            system_prompt = """你是一个Kubernetes专家AI助手。用户提出了一个问题，系统执行了相应的kubectl命令（可能包含重试）并获得了结果。
-
-你的任务是：
-1. 分析用户的原始问题
-2. 理解kubectl命令的执行结果
-3. 针对用户的具体问题给出直接、准确的回答
-4. 如果有重试过程，要特别说明重试的情况和最终结果
-5. 提供有用的统计信息和洞察
-
-回复要求：
-- 直接回答用户的问题
-- 提供具体的数字统计
-- 如果有异常情况，要指出来
-- 如果有重试过程，要说明重试的原因和结果
-- 语言要简洁明了，专业但易懂
-- 不要重复显示原始数据，专注于分析和回答
-
-重试信息处理：
-- 如果命令经过重试才成功，要说明这一点
-- 解释为什么需要重试以及AI是如何修复问题的
-- 强调最终的成功结果
-
-删除操作特殊处理：
-- 如果是删除操作，要特别关注删除的结果
-- 如果删除目标不存在（NotFound错误），应该说明这实际上意味着删除操作达到了预期效果
-- 区分"删除成功"和"删除目标已经不存在"两种情况
-- 对于删除操作，要明确说明最终的状态
-
-示例：
-用户问："删除nginx命名空间"
-如果返回"namespace not found"，你应该回答："✅ 删除操作达到预期效果。nginx命名空间不存在，说明删除目标已经不存在，删除操作的目的已经达到。"
-
-用户问："创建一个namespace"
-如果第一次失败但重试成功，你应该回答："✅ 成功创建了命名空间。虽然初次尝试遇到了一些问题，但AI自动分析错误并调整了命令，最终成功完成了创建操作。"
-"""
             
-            # 准备上下文信息
+            # 准备上下文信息（只截断一次，短输出不产生新分配）
+            # 字段顺序是缓存命中率的关键：服务端提示词缓存按最长公共前缀命中，
+            # 半静态的标签/统计在前，变化最快的查询和输出放在末尾
+            output_excerpt = _truncate(output, 2000)
             context_info = f"""
-用户问题: {query}
-执行命令: {command}
-命令输出: {output[:2000]}...  # 限制长度避免token过多
 格式化结果类型: {formatted_result.get('type', 'unknown')}
 """
-            
+
             if formatted_result.get('type') == 'table':
                 context_info += f"""
 表格数据行数: {formatted_result.get('total_rows', 0)}
 表格列数: {len(formatted_result.get('headers', []))}
 表头: {', '.join(formatted_result.get('headers', []))}
+"""
+
+            context_info += f"""
+用户问题: {query}
+执行命令: {command}
+命令输出: {output_excerpt}
 """
             
-            # 构造请求
+            # 构造请求（系统提示词为模块级常量）
             messages = [
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": _SMART_REPLY_SYSTEM_PROMPT},
                 {"role": "user", "content": context_info}
             ]
             
             # 发送请求
-            completion = self.client.chat.completions.create(
+            completion = await self.client.chat.completions.create(
                 model="hunyuan-turbos-latest",
                 messages=messages,
                 extra_body={
@@ -485,7 +868,7 @@ class SuperKubectlAgent:
             )
             
             smart_reply = completion.choices[0].message.content.strip()
-            logger.info(f"生成智能回复: {smart_reply[:100]}...")
+            logger.info("生成智能回复: %.100s...", smart_reply)
             
             return smart_reply
             
@@ -493,7 +876,8 @@ class SuperKubectlAgent:
             logger.error(f"生成智能回复失败: {str(e)}")
             return self._generate_basic_stats(query, output, formatted_result)
     
-    def _generate_basic_stats(self, query: str, output: str, formatted_result: Dict[str, Any]) -> str:
+    def _generate_basic_stats(self, query: str, output: str, formatted_result: Dict[str, Any],
+                              query_lower: str = None) -> str:
         """
         生成基础统计信息作为fallback
         
@@ -501,12 +885,14 @@ class SuperKubectlAgent:
             query: 用户查询
             output: 命令输出
             formatted_result: 格式化结果
+            query_lower: 调用方已小写化的查询，避免重复分配
             
         Returns:
             str: 基础统计回复
         """
         try:
-            query_lower = query.lower()
+            if query_lower is None:
+                query_lower = query.lower()
             
             if formatted_result.get('type') == 'table':
                 total_rows = formatted_result.get('total_rows', 0)
@@ -559,95 +945,6 @@ class SuperKubectlAgent:
                 logger.warning("LLM客户端不可用，使用基础重试建议")
                 return self._generate_basic_retry_suggestion(failed_command, error_message)
             
-            # 构造错误分析的系统提示词
-            system_prompt = """你是一个Kubernetes专家AI助手，专门负责分析kubectl命令执行错误并提供修复建议。
-
-你的任务是：
-1. 分析kubectl命令执行失败的原因
-2. 根据错误信息判断是否可以通过修改命令来修复
-3. 如果可以修复，生成一个新的kubectl命令（可以包含shell语法）
-4. 提供修复的原因说明
-
-常见错误类型和修复策略：
-1. 资源已存在错误 (AlreadyExists) - 可以改用get命令查看或使用--dry-run
-2. 权限不足错误 (Forbidden) - 检查RBAC权限，可能需要不同的命名空间
-3. 资源不存在错误 (NotFound) - 检查资源名称、命名空间是否正确，可能需要先创建依赖资源
-4. 语法错误 (Invalid) - 修正命令参数格式，可以使用shell语法来简化复杂操作
-5. 网络连接错误 - 可能是临时问题，建议重试相同命令
-6. 资源配额不足 - 可以尝试创建更小的资源或检查配额
-
-**重要规则 - 删除操作特殊处理：**
-- 如果原始命令是删除操作（delete），绝对不要改成查看操作（get、describe等）
-- 删除操作失败时，应该：
-  1. 如果是"资源不存在"错误，说明删除目标已经不存在，可以认为删除成功
-  2. 如果是"命名空间不存在"错误，说明整个命名空间都不存在，删除目标自然也不存在
-  3. 如果是权限问题，不要改变操作类型，而是标记为无法重试
-  4. 如果是语法错误，修正语法但保持删除操作，可以使用shell语法来简化
-- 删除操作的重试命令必须仍然是删除操作，不能改成其他操作类型
-
-其他重要规则：
-- 只返回JSON，不要包含任何其他文字
-- **支持shell语法**：可以使用管道（|）、xargs、grep等来实现复杂操作
-- 优先使用可执行的命令，不要只给建议
-- 如果是权限问题，不要建议提升权限，而是建议使用允许的操作
-- 对于复杂的批量操作，优先使用shell语法组合命令
-
-返回的JSON必须严格按照以下格式：
-{
-    "success": true/false,
-    "can_retry": true/false,
-    "retry_command": "修复后的命令",
-    "retry_reason": "为什么这样修复的原因",
-    "error_analysis": "对错误的详细分析",
-    "confidence": "high/medium/low - 修复成功的信心程度"
-}
-
-如果无法修复，返回：
-{
-    "success": false,
-    "can_retry": false,
-    "error": "无法修复的原因",
-    "error_analysis": "对错误的详细分析"
-}
-
-示例1 - 命名空间不存在（创建依赖）：
-错误: "namespaces \"test\" not found"
-失败命令: "kubectl create deployment nginx --image=nginx --namespace=test"
-正确返回:
-{
-    "success": true,
-    "can_retry": true,
-    "retry_command": "kubectl create namespace test",
-    "retry_reason": "需要先创建命名空间test，然后再创建deployment",
-    "error_analysis": "命名空间test不存在，需要先创建",
-    "confidence": "high"
-}
-
-示例2 - 资源已存在：
-错误: "namespaces \"default\" already exists"
-失败命令: "kubectl create namespace default"
-正确返回:
-{
-    "success": true,
-    "can_retry": true,
-    "retry_command": "kubectl get namespace default",
-    "retry_reason": "命名空间已存在，改为查看现有命名空间",
-    "error_analysis": "命名空间default已经存在",
-    "confidence": "high"
-}
-
-示例3 - 批量删除语法错误（使用shell语法修复）：
-错误: "error: there is no need to specify a resource type as a separate argument when passing arguments in resource/name form"
-失败命令: "kubectl get namespaces -o name | grep '^namespace/a' | xargs kubectl delete"
-正确返回:
-{
-    "success": true,
-    "can_retry": true,
-    "retry_command": "kubectl get namespace -o name | grep '^namespace/a' | cut -d'/' -f2 | xargs kubectl delete namespace",
-    "retry_reason": "修复shell管道命令的语法错误，使用cut命令提取命名空间名称，避免资源类型重复指定",
-    "error_analysis": "原命令在xargs传递参数时出现资源类型重复指定的问题，使用cut命令提取纯命名空间名称可以解决",
-    "confidence": "high"
-}"""
             
             # 准备错误分析上下文
             context_info = f"""
@@ -655,17 +952,17 @@ class SuperKubectlAgent:
 失败的命令: {failed_command}
 错误信息: {error_message}
 步骤编号: {step_number}
-执行历史: {json.dumps(execution_history, ensure_ascii=False, indent=2)}
+执行历史: {fastjson.dumps_str(execution_history, pretty=True)}
 """
             
-            # 构造请求
+            # 构造请求（系统提示词为模块级常量）
             messages = [
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": _ERROR_RETRY_SYSTEM_PROMPT},
                 {"role": "user", "content": context_info}
             ]
             
             # 发送请求
-            completion = self.client.chat.completions.create(
+            completion = await self.client.chat.completions.create(
                 model="hunyuan-turbos-latest",
                 messages=messages,
                 extra_body={
@@ -673,32 +970,20 @@ class SuperKubectlAgent:
                 }
             )
             
-            logger.info(f"错误分析API响应: {completion.model_dump_json()}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("错误分析API响应: %s", completion.model_dump_json())
             
-            # 解析响应
+            # 解析响应（与analyze_query共用同一个JSON提取助手）
             try:
                 content = completion.choices[0].message.content.strip()
                 
-                # 尝试从内容中提取JSON结构
-                json_match = re.search(r'```json\s*(.*?)\s*```', content, re.DOTALL)
-                if json_match:
-                    try:
-                        extracted_json = json_match.group(1)
-                        analysis = json.loads(extracted_json)
-                        
-                        return analysis
-                    except Exception as e:
-                        logger.warning(f"解析JSON块失败: {str(e)}")
-                
-                # 尝试直接解析为JSON对象
-                try:
-                    analysis = json.loads(content)
+                analysis = _parse_llm_json(content)
+                if isinstance(analysis, dict):
                     return analysis
-                except Exception as e:
-                    logger.warning(f"直接解析JSON失败: {str(e)}")
-                    
-                    # 如果解析失败，返回基础的重试建议
-                    return self._generate_basic_retry_suggestion(failed_command, error_message)
+                
+                # 如果解析失败，返回基础的重试建议
+                logger.warning("错误分析响应中未找到JSON对象，使用基础重试建议")
+                return self._generate_basic_retry_suggestion(failed_command, error_message)
                     
             except Exception as e:
                 logger.error(f"解析错误分析响应失败: {str(e)}")
@@ -728,7 +1013,7 @@ class SuperKubectlAgent:
         # 特殊处理删除操作
         if 'delete' in command_lower:
             # 删除操作遇到"资源不存在"错误，应该认为删除成功
-            if 'not found' in error_lower or 'notfound' in error_lower:
+            if _NOT_FOUND_RE.search(error_lower):
                 return {
                     "success": False,
                     "can_retry": False,
@@ -753,7 +1038,7 @@ class SuperKubectlAgent:
                     }
             
             # 删除操作遇到权限错误，不改变操作类型
-            if 'forbidden' in error_lower or 'unauthorized' in error_lower:
+            if _FORBIDDEN_RE.search(error_lower):
                 return {
                     "success": False,
                     "can_retry": False,
@@ -764,7 +1049,7 @@ class SuperKubectlAgent:
         # 非删除操作的处理逻辑
         
         # 资源已存在错误
-        if 'already exists' in error_lower or 'alreadyexists' in error_lower:
+        if _EXISTS_RE.search(error_lower):
             if 'create' in command_lower:
                 # 将create改为get来查看现有资源
                 retry_command = failed_command.replace('create', 'get', 1)
@@ -778,10 +1063,9 @@ class SuperKubectlAgent:
                 }
         
         # 命名空间不存在错误 - 重要修复
-        if 'not found' in error_lower and 'namespace' in error_lower:
+        if 'namespace' in error_lower and _NOT_FOUND_RE.search(error_lower):
             # 从错误信息中提取命名空间名称
-            import re
-            namespace_match = re.search(r'namespaces?\s+["\']([^"\']+)["\']?\s+not found', error_message, re.IGNORECASE)
+            namespace_match = _NS_NOT_FOUND_RE.search(error_message)
             if namespace_match:
                 namespace_name = namespace_match.group(1)
                 return {
@@ -794,7 +1078,7 @@ class SuperKubectlAgent:
                 }
         
         # 其他资源不存在错误
-        if 'not found' in error_lower or 'notfound' in error_lower:
+        if _NOT_FOUND_RE.search(error_lower):
             return {
                 "success": False,
                 "can_retry": False,
@@ -803,7 +1087,7 @@ class SuperKubectlAgent:
             }
         
         # 权限错误
-        if 'forbidden' in error_lower or 'unauthorized' in error_lower:
+        if _FORBIDDEN_RE.search(error_lower):
             return {
                 "success": False,
                 "can_retry": False,
@@ -812,7 +1096,7 @@ class SuperKubectlAgent:
             }
         
         # 网络或临时错误
-        if any(keyword in error_lower for keyword in ['timeout', 'connection', 'network', 'temporary']):
+        if _NETWORK_RE.search(error_lower):
             return {
                 "success": True,
                 "can_retry": True,
@@ -827,7 +1111,7 @@ class SuperKubectlAgent:
             "success": False,
             "can_retry": False,
             "error": "无法自动修复此错误",
-            "error_analysis": f"未知错误类型: {error_message[:100]}"
+            "error_analysis": "未知错误类型: " + _truncate(error_message, 100)
         }
     
     async def generate_smart_reply_with_retry_info(self, query: str, command: str, output: str, formatted_result: Dict[str, Any]) -> str:
@@ -849,56 +1133,20 @@ class SuperKubectlAgent:
                 logger.warning("LLM客户端不可用，返回基础统计")
                 return self._generate_basic_stats_with_retry(query, output, formatted_result)
             
-            # 构造智能回复的系统提示词
-            system_prompt = """你是一个Kubernetes专家AI助手。用户提出了一个问题，系统执行了相应的kubectl命令（可能包含重试）并获得了结果。
-
-你的任务是：
-1. 分析用户的原始问题
-2. 理解kubectl命令的执行结果
-3. 针对用户的具体问题给出直接、准确的回答
-4. 如果有重试过程，要特别说明重试的情况和最终结果
-5. 提供有用的统计信息和洞察
-
-回复要求：
-- 直接回答用户的问题
-- 提供具体的数字统计
-- 如果有异常情况，要指出来
-- 如果有重试过程，要说明重试的原因和结果
-- 语言要简洁明了，专业但易懂
-- 不要重复显示原始数据，专注于分析和回答
-
-重试信息处理：
-- 如果命令经过重试才成功，要说明这一点
-- 解释为什么需要重试以及AI是如何修复问题的
-- 强调最终的成功结果
-
-删除操作特殊处理：
-- 如果是删除操作，要特别关注删除的结果
-- 如果删除目标不存在（NotFound错误），应该说明这实际上意味着删除操作达到了预期效果
-- 区分"删除成功"和"删除目标已经不存在"两种情况
-- 对于删除操作，要明确说明最终的状态
-
-示例：
-用户问："删除nginx命名空间"
-如果返回"namespace not found"，你应该回答："✅ 删除操作达到预期效果。nginx命名空间不存在，说明删除目标已经不存在，删除操作的目的已经达到。"
-
-用户问："创建一个namespace"
-如果第一次失败但重试成功，你应该回答："✅ 成功创建了命名空间。虽然初次尝试遇到了一些问题，但AI自动分析错误并调整了命令，最终成功完成了创建操作。"
-"""
             
-            # 准备上下文信息
+            # 准备上下文信息（步骤统计单次遍历完成）
             steps = formatted_result.get("steps", [])
+            total_retries, success_count, fail_count = _tally_steps(steps)
             retry_info = ""
             
-            if steps:
-                total_retries = sum(step.get("retry_count", 0) for step in steps)
-                if total_retries > 0:
-                    retry_info = f"执行过程中进行了 {total_retries} 次智能重试。"
+            if total_retries > 0:
+                retry_info = f"执行过程中进行了 {total_retries} 次智能重试。"
             
+            # 只截断一次，短输出不产生新分配
+            # 字段顺序是缓存命中率的关键：服务端提示词缓存按最长公共前缀命中，
+            # 半静态的标签/统计在前，变化最快的查询和输出放在末尾
+            output_excerpt = _truncate(output, 2000)
             context_info = f"""
-用户问题: {query}
-执行命令: {command}
-命令输出: {output[:2000]}...  # 限制长度避免token过多
 格式化结果类型: {formatted_result.get('type', 'unknown')}
 重试信息: {retry_info}
 """
@@ -906,35 +1154,176 @@ class SuperKubectlAgent:
             if formatted_result.get('type') == 'multi_step':
                 context_info += f"""
 总步骤数: {formatted_result.get('total_steps', 0)}
-成功步骤数: {len([s for s in steps if s.get('success', False)])}
-失败步骤数: {len([s for s in steps if not s.get('success', True)])}
+成功步骤数: {success_count}
+失败步骤数: {fail_count}
 """
             
-            # 构造请求
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": context_info}
-            ]
-            
-            # 发送请求
-            completion = self.client.chat.completions.create(
+            context_info += f"""
+用户问题: {query}
+执行命令: {command}
+命令输出: {output_excerpt}
+"""
+
+            # 响应级缓存：相同(查询,命令,输出)在TTL内直接复用，省掉一次LLM往返
+            # 直接用截断片段本体做键：hash()碰撞会把别的输出的回复错发出去，
+            # 片段不超过2000字符，存原文的开销可以忽略
+            cache_key = (query, command, output_excerpt)
+            cached = _reply_cache_get(cache_key)
+            if cached is not None:
+                logger.info("智能回复命中缓存: %.100s...", cached)
+                return cached
+
+            # 通过批量合并队列发送请求：并发的回复生成会被合并为一次LLM调用
+            # 系统提示词复用模块常量：字节级一致的前缀才能命中服务端的提示词缓存
+            # 队列里只保留截断后的片段：fallback统计不读原始输出，
+            # 排队期间不用把完整日志（可能MB级）钉在内存里
+            smart_reply = await self._submit_reply_request(
+                _SMART_REPLY_SYSTEM_PROMPT, context_info, query, output_excerpt, formatted_result
+            )
+            logger.info("生成带重试信息的智能回复: %.100s...", smart_reply)
+
+            _reply_cache_put(cache_key, smart_reply)
+            return smart_reply
+
+        except Exception as e:
+            logger.error(f"生成带重试信息的智能回复失败: {str(e)}")
+            return self._generate_basic_stats_with_retry(query, output, formatted_result)
+
+    async def _submit_reply_request(self, system_prompt: str, context_info: str,
+                                    query: str, output: str, formatted_result: Dict[str, Any]) -> str:
+        """提交智能回复请求到批量合并队列并等待结果
+
+        队列和worker挂在模块级注册表上、按事件循环共享：同一进程内
+        并发的请求即便各自持有一个agent实例也能合并为一次LLM调用。
+        """
+        loop = asyncio.get_running_loop()
+        key = id(loop)
+
+        # 顺带清理已关闭事件循环遗留的注册项：空闲中的worker随循环一起
+        # 死亡时finally不会执行，条目需要在这里摘除
+        for stale_key, stale_entry in list(_REPLY_BATCHERS.items()):
+            if stale_key != key and (stale_entry[2].is_closed() or stale_entry[1].done()):
+                _REPLY_BATCHERS.pop(stale_key, None)
+
+        entry = _REPLY_BATCHERS.get(key)
+        if entry is None or entry[1].done():
+            queue = asyncio.Queue()
+            task = loop.create_task(self._reply_batch_worker(queue, key))
+            _REPLY_BATCHERS[key] = (queue, task, loop)
+        else:
+            queue = entry[0]
+
+        future = loop.create_future()
+        queue.put_nowait((system_prompt, context_info, query, output, formatted_result, future))
+        return await future
+
+    async def _reply_batch_worker(self, queue: "asyncio.Queue", key: int):
+        """后台任务：在短窗口内收集并发的回复请求，合并为一次LLM调用
+
+        队列持续空闲时worker自行退出并从注册表摘除，不会随事件循环
+        的生命周期无限累积常驻任务。
+        """
+        try:
+            while True:
+                try:
+                    first = await asyncio.wait_for(queue.get(), timeout=_REPLY_WORKER_IDLE)
+                except asyncio.TimeoutError:
+                    # 超时与put_nowait之间有竞态：提交方可能在超时取消
+                    # 内部get()之后、worker恢复之前入队，退出前必须复查
+                    if queue.empty():
+                        return
+                    continue
+                pending = [first]
+                # 等待一个短窗口，收集同时到达的请求
+                await asyncio.sleep(_REPLY_BATCH_WINDOW)
+
+                budget = len(pending[0][1])
+                while len(pending) < _REPLY_BATCH_MAX and budget < _REPLY_BATCH_CHAR_BUDGET:
+                    try:
+                        item = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+                    pending.append(item)
+                    budget += len(item[1])
+
+                try:
+                    if len(pending) == 1:
+                        await self._resolve_single_reply(pending[0])
+                    else:
+                        await self._resolve_batched_replies(pending)
+                except Exception as e:
+                    logger.error(f"批量回复处理异常: {str(e)}")
+                    for item in pending:
+                        if not item[5].done():
+                            item[5].set_result(
+                                self._generate_basic_stats_with_retry(item[2], item[3], item[4])
+                            )
+        finally:
+            _REPLY_BATCHERS.pop(key, None)
+            # 兜底：退出瞬间若仍有残留请求，用基础统计回复解决其future，
+            # 绝不能让提交方无限等待一个永远不会被消费的队列项
+            while True:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if not item[5].done():
+                    item[5].set_result(
+                        self._generate_basic_stats_with_retry(item[2], item[3], item[4])
+                    )
+
+    async def _resolve_single_reply(self, item):
+        """直接处理单个回复请求"""
+        system_prompt, context_info, query, output, formatted_result, future = item
+        try:
+            completion = await self.client.chat.completions.create(
                 model="hunyuan-turbos-latest",
-                messages=messages,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": context_info}
+                ],
                 extra_body={
                     "enable_enhancement": True
                 }
             )
-            
-            smart_reply = completion.choices[0].message.content.strip()
-            logger.info(f"生成带重试信息的智能回复: {smart_reply[:100]}...")
-            
-            return smart_reply
-            
+            future.set_result(completion.choices[0].message.content.strip())
         except Exception as e:
-            logger.error(f"生成带重试信息的智能回复失败: {str(e)}")
-            return self._generate_basic_stats_with_retry(query, output, formatted_result)
+            logger.error(f"生成智能回复失败: {str(e)}")
+            future.set_result(self._generate_basic_stats_with_retry(query, output, formatted_result))
+
+    async def _resolve_batched_replies(self, pending):
+        """将多个回复请求合并为一次LLM调用，按分隔符拆分结果"""
+        system_prompt = pending[0][0]
+        batch_instruction = (
+            f"下面是 {len(pending)} 个相互独立的请求，请依次回答每一个，"
+            f"回答之间用\n===REPLY_SEPARATOR===\n分隔，不要输出其他分隔内容。\n\n"
+        )
+        numbered = [f"请求 {i + 1}:\n{item[1]}" for i, item in enumerate(pending)]
+        try:
+            completion = await self.client.chat.completions.create(
+                model="hunyuan-turbos-latest",
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": batch_instruction + "\n\n".join(numbered)}
+                ],
+                extra_body={
+                    "enable_enhancement": True
+                }
+            )
+            content = completion.choices[0].message.content
+            parts = [p.strip() for p in content.split(_REPLY_SEPARATOR.strip())]
+            if len(parts) != len(pending):
+                raise ValueError(f"批量回复数量不匹配: 期望{len(pending)}个，实际{len(parts)}个")
+            for item, reply in zip(pending, parts):
+                item[5].set_result(reply)
+        except Exception as e:
+            logger.warning(f"批量回复生成失败，回退到逐个处理: {str(e)}")
+            for item in pending:
+                if not item[5].done():
+                    await self._resolve_single_reply(item)
     
-    def _generate_basic_stats_with_retry(self, query: str, output: str, formatted_result: Dict[str, Any]) -> str:
+    def _generate_basic_stats_with_retry(self, query: str, output: str, formatted_result: Dict[str, Any],
+                                         query_lower: str = None) -> str:
         """
         生成包含重试信息的基础统计信息作为fallback
         
@@ -942,57 +1331,30 @@ class SuperKubectlAgent:
             query: 用户查询
             output: 命令输出
             formatted_result: 格式化结果
+            query_lower: 调用方已小写化的查询，避免重复分配
             
         Returns:
             str: 基础统计回复
         """
         try:
-            query_lower = query.lower()
-            
-            # 计算重试信息
-            retry_info = ""
-            if formatted_result.get('type') == 'multi_step':
-                steps = formatted_result.get("steps", [])
-                total_retries = sum(step.get("retry_count", 0) for step in steps)
-                if total_retries > 0:
-                    retry_info = f"（经过 {total_retries} 次智能重试）"
-            
-            if formatted_result.get('type') == 'table':
-                total_rows = formatted_result.get('total_rows', 0)
-                headers = formatted_result.get('headers', [])
-                
-                if 'pod' in query_lower and '多少' in query_lower:
-                    return f"根据查询结果，集群中总共有 {total_rows} 个Pod{retry_info}。"
-                elif 'node' in query_lower or '节点' in query_lower:
-                    return f"集群中总共有 {total_rows} 个节点{retry_info}。"
-                elif 'service' in query_lower or '服务' in query_lower:
-                    return f"集群中总共有 {total_rows} 个服务{retry_info}。"
-                elif 'deployment' in query_lower:
-                    return f"集群中总共有 {total_rows} 个Deployment{retry_info}。"
-                else:
-                    return f"查询结果包含 {total_rows} 条记录，共 {len(headers)} 个字段{retry_info}。"
-            
-            elif formatted_result.get('type') == 'text':
-                line_count = formatted_result.get('line_count', 0)
-                if 'describe' in query_lower:
-                    return f"已获取详细信息，包含 {line_count} 行详细配置和状态信息{retry_info}。"
-                elif 'log' in query_lower or '日志' in query_lower:
-                    return f"已获取日志信息，共 {line_count} 行日志记录{retry_info}。"
-                else:
-                    return f"命令执行成功，返回了 {line_count} 行信息{retry_info}。"
+            if query_lower is None:
+                query_lower = query.lower()
             
-            elif formatted_result.get('type') == 'multi_step':
-                steps = formatted_result.get("steps", [])
-                success_count = len([s for s in steps if s.get('success', False)])
-                total_count = len(steps)
-                
-                if success_count == total_count:
-                    return f"✅ 成功完成所有 {total_count} 个步骤{retry_info}。"
-                else:
-                    return f"⚠️ 完成了 {total_count} 个步骤中的 {success_count} 个{retry_info}。"
+            # 归一化出可哈希的缓存键，分支逻辑在lru_cache的模块函数里只算一次
+            rtype = formatted_result.get('type', '')
+            steps = formatted_result.get("steps", []) if rtype == 'multi_step' else []
+            total_retries, success_count, _ = _tally_steps(steps)
             
-            else:
-                return f"命令执行成功{retry_info}，请查看详细结果。"
+            return _basic_stats_with_retry_reply(
+                _stats_bucket(query_lower, rtype),
+                rtype,
+                formatted_result.get('total_rows', 0),
+                len(formatted_result.get('headers', [])),
+                formatted_result.get('line_count', 0),
+                len(steps),
+                success_count,
+                total_retries
+            )
                 
         except Exception as e:
             logger.error(f"生成带重试信息的基础统计失败: {str(e)}")
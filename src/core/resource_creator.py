@@ -1,17 +1,54 @@
 from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+import threading
 import yaml
 from kubernetes import client
 from ..utils.logger import get_logger
 
+# 优先使用libyaml的C解析器，多文档manifest快一个数量级
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
 logger = get_logger(__name__)
 
 class ResourceCreator:
     """Kubernetes 资源创建工具类"""
     
+    # 进程级共享的API对象：惰性构建一次，所有实例复用同一个连接池
+    _apps_v1 = None
+    _networking_v1 = None
+    _api_lock = threading.Lock()
+    
+    @classmethod
+    def _get_apps_v1(cls) -> client.AppsV1Api:
+        """获取共享的AppsV1Api实例（双重检查加锁）"""
+        if cls._apps_v1 is None:
+            with cls._api_lock:
+                if cls._apps_v1 is None:
+                    cls._apps_v1 = client.AppsV1Api()
+        return cls._apps_v1
+    
+    @classmethod
+    def _get_networking_v1(cls) -> client.NetworkingV1Api:
+        """获取共享的NetworkingV1Api实例（双重检查加锁）"""
+        if cls._networking_v1 is None:
+            with cls._api_lock:
+                if cls._networking_v1 is None:
+                    cls._networking_v1 = client.NetworkingV1Api()
+        return cls._networking_v1
+    
     def __init__(self, k8s_client: client.CoreV1Api):
         self.k8s_client = k8s_client
-        self.apps_v1 = client.AppsV1Api()
-        self.networking_v1 = client.NetworkingV1Api()
+        self.apps_v1 = self._get_apps_v1()
+        self.networking_v1 = self._get_networking_v1()
+        # kind到创建接口的映射：O(1)查表代替逐文档的if/elif链
+        self._kind_dispatch = {
+            'Deployment': self.apps_v1.create_namespaced_deployment,
+            'Service': self.k8s_client.create_namespaced_service,
+            'Ingress': self.networking_v1.create_namespaced_ingress
+        }
         
     def create_deployment(self, namespace: str, name: str, 
                          image: str, replicas: int = 1,
@@ -21,26 +58,24 @@ class ResourceCreator:
             if labels is None:
                 labels = {"app": name}
                 
-            deployment = client.V1Deployment(
-                metadata=client.V1ObjectMeta(name=name),
-                spec=client.V1DeploymentSpec(
-                    replicas=replicas,
-                    selector=client.V1LabelSelector(
-                        match_labels=labels
-                    ),
-                    template=client.V1PodTemplateSpec(
-                        metadata=client.V1ObjectMeta(labels=labels),
-                        spec=client.V1PodSpec(
-                            containers=[
-                                client.V1Container(
-                                    name=name,
-                                    image=image
-                                )
+            # 直接构造dict请求体：跳过V1*模型树的构建与反射序列化
+            deployment = {
+                'apiVersion': 'apps/v1',
+                'kind': 'Deployment',
+                'metadata': {'name': name},
+                'spec': {
+                    'replicas': replicas,
+                    'selector': {'matchLabels': labels},
+                    'template': {
+                        'metadata': {'labels': labels},
+                        'spec': {
+                            'containers': [
+                                {'name': name, 'image': image}
                             ]
-                        )
-                    )
-                )
-            )
+                        }
+                    }
+                }
+            }
             
             result = self.apps_v1.create_namespaced_deployment(
                 namespace=namespace,
@@ -62,19 +97,22 @@ class ResourceCreator:
                       selector: Dict, ports: List[Dict]) -> Dict:
         """创建 Service"""
         try:
-            service = client.V1Service(
-                metadata=client.V1ObjectMeta(name=name),
-                spec=client.V1ServiceSpec(
-                    selector=selector,
-                    ports=[
-                        client.V1ServicePort(
-                            port=port['port'],
-                            target_port=port.get('target_port', port['port']),
-                            protocol=port.get('protocol', 'TCP')
-                        ) for port in ports
+            # 直接构造dict请求体：跳过V1*模型树的构建与反射序列化
+            service = {
+                'apiVersion': 'v1',
+                'kind': 'Service',
+                'metadata': {'name': name},
+                'spec': {
+                    'selector': selector,
+                    'ports': [
+                        {
+                            'port': port['port'],
+                            'targetPort': port.get('target_port', port['port']),
+                            'protocol': port.get('protocol', 'TCP')
+                        } for port in ports
                     ]
-                )
-            )
+                }
+            }
             
             result = self.k8s_client.create_namespaced_service(
                 namespace=namespace,
@@ -97,40 +135,33 @@ class ResourceCreator:
                       rules: List[Dict]) -> Dict:
         """创建 Ingress"""
         try:
+            # 直接构造dict请求体：跳过V1*模型树的构建与反射序列化
             ingress_rules = []
             for rule in rules:
                 http_paths = []
                 for path in rule['paths']:
-                    http_paths.append(
-                        client.V1HTTPIngressPath(
-                            path=path['path'],
-                            path_type=path.get('path_type', 'Prefix'),
-                            backend=client.V1IngressBackend(
-                                service=client.V1IngressServiceBackend(
-                                    name=path['service_name'],
-                                    port=client.V1ServiceBackendPort(
-                                        number=path['service_port']
-                                    )
-                                )
-                            )
-                        )
-                    )
+                    http_paths.append({
+                        'path': path['path'],
+                        'pathType': path.get('path_type', 'Prefix'),
+                        'backend': {
+                            'service': {
+                                'name': path['service_name'],
+                                'port': {'number': path['service_port']}
+                            }
+                        }
+                    })
                     
-                ingress_rules.append(
-                    client.V1IngressRule(
-                        host=rule['host'],
-                        http=client.V1HTTPIngressRuleValue(
-                            paths=http_paths
-                        )
-                    )
-                )
+                ingress_rules.append({
+                    'host': rule['host'],
+                    'http': {'paths': http_paths}
+                })
                 
-            ingress = client.V1Ingress(
-                metadata=client.V1ObjectMeta(name=name),
-                spec=client.V1IngressSpec(
-                    rules=ingress_rules
-                )
-            )
+            ingress = {
+                'apiVersion': 'networking.k8s.io/v1',
+                'kind': 'Ingress',
+                'metadata': {'name': name},
+                'spec': {'rules': ingress_rules}
+            }
             
             result = self.networking_v1.create_namespaced_ingress(
                 namespace=namespace,
@@ -157,41 +188,38 @@ class ResourceCreator:
             logger.error(f"创建 Ingress 失败: {str(e)}")
             raise
             
+    def _create_one(self, namespace: str, resource: Dict) -> Dict:
+        """创建单个资源文档（供create_from_yaml串行/并发两条路径复用）"""
+        kind = resource['kind']
+        result = self._kind_dispatch[kind](namespace=namespace, body=resource)
+        return {
+            'kind': kind,
+            'name': result.metadata.name,
+            'namespace': result.metadata.namespace,
+            'status': 'created'
+        }
+
     def create_from_yaml(self, namespace: str, yaml_content: str) -> Dict:
         """从 YAML 创建资源"""
         try:
-            resources = yaml.safe_load_all(yaml_content)
-            results = []
-            
-            for resource in resources:
-                kind = resource['kind']
-                name = resource['metadata']['name']
-                
-                if kind == 'Deployment':
-                    result = self.apps_v1.create_namespaced_deployment(
-                        namespace=namespace,
-                        body=resource
-                    )
-                elif kind == 'Service':
-                    result = self.k8s_client.create_namespaced_service(
-                        namespace=namespace,
-                        body=resource
-                    )
-                elif kind == 'Ingress':
-                    result = self.networking_v1.create_namespaced_ingress(
-                        namespace=namespace,
-                        body=resource
-                    )
+            # 先物化全部文档，过滤掉不支持的kind
+            supported = []
+            for resource in yaml.load_all(yaml_content, Loader=_SafeLoader):
+                if resource['kind'] in self._kind_dispatch:
+                    supported.append(resource)
                 else:
-                    logger.warning(f"不支持的资源类型: {kind}")
-                    continue
-                    
-                results.append({
-                    'kind': kind,
-                    'name': result.metadata.name,
-                    'namespace': result.metadata.namespace,
-                    'status': 'created'
-                })
+                    logger.warning(f"不支持的资源类型: {resource['kind']}")
+            
+            # 多文档时并发创建：支持的kind（Deployment/Service/Ingress）彼此独立，
+            # API Server往返可以重叠；executor.map保持与文档一致的顺序
+            if len(supported) > 1:
+                with ThreadPoolExecutor(max_workers=8) as executor:
+                    results = list(executor.map(
+                        lambda resource: self._create_one(namespace, resource),
+                        supported
+                    ))
+            else:
+                results = [self._create_one(namespace, resource) for resource in supported]
                 
             return {
                 'created_resources': results,
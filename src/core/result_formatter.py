@@ -1,11 +1,25 @@
+import io
 import re
 import json
-import yaml
 from typing import Dict, Any, List, Optional
 from ..utils.logger import get_logger
 
+# 尝试导入 pandas，可用时表格解析走C层定宽解析器
+try:
+    import pandas as pd
+    HAS_PANDAS = True
+except ImportError:
+    pd = None
+    HAS_PANDAS = False
+
 logger = get_logger(__name__)
 
+# 表格列分隔正则：模块加载时编译一次
+_SPLIT_RE = re.compile(r'\s{2,}')
+
+# kubectl表格输出的典型表头列名
+_TABLE_HEADER_TOKENS = frozenset(('NAME', 'READY', 'STATUS', 'AGE', 'NAMESPACE'))
+
 class ResultFormatter:
     """结果格式化器"""
     
@@ -40,11 +54,11 @@ class ResultFormatter:
     
     def _detect_format(self, output: str) -> str:
         """自动检测最佳输出格式"""
-        lines = output.strip().split('\n')
-        if len(lines) >= 2:
-            # 检查是否有表头
-            first_line = lines[0]
-            if any(header in first_line.upper() for header in ['NAME', 'READY', 'STATUS', 'AGE', 'NAMESPACE']):
+        # 只取首行判断表头，避免为了探测格式切分整个输出
+        first_line, sep, _ = output.strip().partition('\n')
+        if sep:
+            # 集合交集代替逐个关键词的子串扫描
+            if _TABLE_HEADER_TOKENS.intersection(first_line.upper().split()):
                 return "table"
         
         return "text"
@@ -58,18 +72,38 @@ class ResultFormatter:
         try:
             # 解析表头
             header_line = lines[0]
-            headers = re.split(r'\s{2,}', header_line.strip())
+            headers = _SPLIT_RE.split(header_line.strip())
+            
+            # 大表优先用pandas的定宽解析：按表头推断列宽，逐行解析在C层完成
+            if HAS_PANDAS:
+                try:
+                    # 单元格必须原样保留：dtype=str禁用类型推断（避免"2"变"2.0"、
+                    # "007"变"7"），na_filter=False禁用NA识别（"NA"/"null"等字面量
+                    # 不清洗、缺失单元格直接给空串），行为与纯Python路径一致且更快
+                    df = pd.read_fwf(io.StringIO(output), dtype=str,
+                                     keep_default_na=False, na_filter=False)
+                    if [str(c) for c in df.columns] == headers:
+                        return {
+                            "type": "table",
+                            "headers": headers,
+                            "data": df.values.tolist(),
+                            "total_rows": len(df)
+                        }
+                except Exception:
+                    # 列宽推断失败时静默回退到纯Python路径
+                    pass
             
             # 解析数据行
+            header_count = len(headers)
             data_rows = []
             for line in lines[1:]:
                 if line.strip():
                     # 使用正则表达式分割，保持与表头对齐
-                    row_data = re.split(r'\s{2,}', line.strip())
+                    row_data = _SPLIT_RE.split(line.strip())
                     # 确保行数据长度与表头匹配
-                    while len(row_data) < len(headers):
-                        row_data.append("")
-                    data_rows.append(row_data[:len(headers)])
+                    if len(row_data) < header_count:
+                        row_data += [""] * (header_count - len(row_data))
+                    data_rows.append(row_data[:header_count])
             
             return {
                 "type": "table",
@@ -84,24 +118,21 @@ class ResultFormatter:
     
     def _format_as_text(self, output: str) -> Dict[str, Any]:
         """格式化为文本"""
-        # 检查是否是YAML或JSON格式
+        # 先看首字符再决定是否解析：分类不需要完整解析YAML/描述文本
         content_type = "text"
-        try:
-            # 尝试解析为JSON
-            json.loads(output)
-            content_type = "json"
-        except:
+        stripped = output.lstrip()
+        if stripped[:1] in '{[':
             try:
-                # 尝试解析为YAML
-                yaml.safe_load(output)
-                if output.strip().startswith(('apiVersion:', 'kind:', 'metadata:')):
-                    content_type = "yaml"
-            except:
+                json.loads(output)
+                content_type = "json"
+            except (ValueError, TypeError):
                 pass
+        elif stripped.startswith(('apiVersion:', 'kind:', 'metadata:')):
+            content_type = "yaml"
         
         return {
             "type": "text",
             "content_type": content_type,
             "content": output,
-            "line_count": len(output.split('\n'))
+            "line_count": output.count('\n') + 1
         } 
\ No newline at end of file
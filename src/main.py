@@ -1,8 +1,9 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse
-import os
+from fastapi.responses import HTMLResponse, Response
+import hashlib
 from pathlib import Path
 from .api.routes import router
 from .utils.config import Config
@@ -10,29 +11,57 @@ from .utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 可用时用orjson序列化JSON响应：大表结果（上千行的formatted_result）比标准json快数倍
+try:
+    import orjson  # noqa: F401  ORJSONResponse运行时依赖orjson
+    from fastapi.responses import ORJSONResponse
+    _DEFAULT_RESPONSE_CLASS = ORJSONResponse
+except ImportError:
+    from fastapi.responses import JSONResponse
+    _DEFAULT_RESPONSE_CLASS = JSONResponse
+
 # 创建FastAPI应用
 app = FastAPI(
     title=Config.APP_NAME,
     version=Config.VERSION,
-    description="Kubernetes智能助手API"
+    description="Kubernetes智能助手API",
+    default_response_class=_DEFAULT_RESPONSE_CLASS
 )
 
+# 响应压缩：首页HTML约18KB，压缩后显著降低带宽占用；小响应不压缩
+app.add_middleware(GZipMiddleware, minimum_size=512)
+
 # 获取CORS配置
 cors_config = Config.get_cors_config()
 
-# 配置CORS
+# 配置CORS（默认显式来源而非通配符：凭证模式下规范要求明确来源，
+# 固定列表也省去中间件逐请求回显Origin的分支）
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=cors_config.get('allow_origins', ['*']),
+    allow_origins=cors_config.get('allow_origins', ['http://localhost:8080', 'http://127.0.0.1:8080']),
     allow_credentials=cors_config.get('allow_credentials', True),
     allow_methods=cors_config.get('allow_methods', ['*']),
     allow_headers=cors_config.get('allow_headers', ['*'])
 )
 
-# 创建静态文件目录
+# 创建静态文件目录（单次系统调用，目录已存在时直接返回）
 static_dir = Path(__file__).parent.parent / "static"
-if not os.path.exists(static_dir):
-    os.makedirs(static_dir)
+static_dir.mkdir(parents=True, exist_ok=True)
+
+# 兜底首页在模块加载时构建并编码一次，请求路径上直接返回预编码字节
+_FALLBACK_HOME_HTML_BYTES = f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <title>{Config.APP_NAME} - 错误</title>
+    <meta charset="UTF-8">
+</head>
+<body>
+    <h1>{Config.APP_NAME}</h1>
+    <p>静态文件未找到，请检查 static/index.html 文件是否存在。</p>
+</body>
+</html>
+""".encode('utf-8')
 
 # 注册路由
 app.include_router(router, prefix="/api/v1")
@@ -40,27 +69,33 @@ app.include_router(router, prefix="/api/v1")
 # 挂载静态文件
 app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 
-@app.get("/", response_class=HTMLResponse)
-async def get_home():
-    """返回静态HTML首页"""
+def _load_home_page():
+    """把首页读入内存并预计算ETag，请求路径上不再碰磁盘"""
     static_html_path = static_dir / "index.html"
     if static_html_path.exists():
-        return FileResponse(static_html_path)
+        data = static_html_path.read_bytes()
     else:
-        # 如果静态文件不存在，返回简单的错误页面
-        return HTMLResponse(f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>{Config.APP_NAME} - 错误</title>
-            <meta charset="UTF-8">
-        </head>
-        <body>
-            <h1>{Config.APP_NAME}</h1>
-            <p>静态文件未找到，请检查 static/index.html 文件是否存在。</p>
-        </body>
-        </html>
-        """)
+        # 静态文件不存在时使用预生成的错误页面（导入时已编码为bytes）
+        data = _FALLBACK_HOME_HTML_BYTES
+    app.state.home_bytes = data
+    app.state.home_etag = hashlib.blake2b(data, digest_size=16).hexdigest()
+
+@app.get("/", response_class=HTMLResponse)
+async def get_home(request: Request):
+    """返回静态HTML首页（内存直出，支持ETag协商缓存）"""
+    etag = getattr(app.state, "home_etag", None)
+    if etag is None:
+        _load_home_page()
+        etag = app.state.home_etag
+    
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304)
+    
+    return Response(
+        content=app.state.home_bytes,
+        media_type="text/html",
+        headers={"ETag": etag, "Cache-Control": "public, max-age=300"}
+    )
 
 @app.on_event("startup")
 async def startup_event():
@@ -72,12 +107,32 @@ async def startup_event():
     except Exception as e:
         logger.error(f"配置验证失败: {str(e)}")
         raise
+    
+    # 预加载首页到内存
+    _load_home_page()
+
+def _uvicorn_perf_kwargs() -> dict:
+    """可用时启用uvloop事件循环和httptools HTTP解析器（均为C实现）"""
+    kwargs = {}
+    try:
+        import uvloop  # noqa: F401
+        kwargs["loop"] = "uvloop"
+    except ImportError:
+        pass
+    try:
+        import httptools  # noqa: F401
+        kwargs["http"] = "httptools"
+    except ImportError:
+        pass
+    return kwargs
 
 if __name__ == "__main__":
     import uvicorn
+    # 注意：reload=True时uvicorn忽略workers；生产部署应设reload=False
     uvicorn.run(
         "main:app",
         host=Config.API_HOST,
         port=Config.API_PORT,
-        reload=Config.API_RELOAD
-    ) 
\ No newline at end of file
+        reload=Config.API_RELOAD,
+        **_uvicorn_perf_kwargs()
+    )
@@ -0,0 +1,58 @@
+import os
+from pathlib import Path
+
+import pytest
+import yaml
+
+# 在任何被测模块导入前标记测试环境：get_logger在模块导入期读取该
+# 变量决定是否挂文件处理器，函数级fixture设置得太晚兜不住收集阶段
+os.environ.setdefault("TESTING", "true")
+
+@pytest.fixture(scope="session", autouse=True)
+def test_config(tmp_path_factory):
+    """测试专用配置文件
+
+    在真实config.yml基础上把LLM超时压到1秒：测试里走到LLM错误路径时
+    不再按生产超时（60秒）阻塞worker。会话结束后还原配置路径。
+    """
+    from ..utils.config import Config
+
+    repo_config = Path(__file__).parent.parent.parent / "config.yml"
+    data = yaml.safe_load(repo_config.read_text(encoding='utf-8'))
+    data.setdefault('llm', {}).setdefault('hunyuan', {})['timeout'] = 1
+
+    config_path = tmp_path_factory.mktemp("config") / "test_config.yml"
+    config_path.write_text(yaml.safe_dump(data, allow_unicode=True), encoding='utf-8')
+
+    Config.set_config_file_path(str(config_path))
+    yield
+    Config._config_file_path = None
+    Config._config_data = None
+    Config._flat = None
+
+@pytest.fixture(scope="session")
+def client(test_config):
+    """会话级TestClient
+
+    app的导入和TestClient构建放到fixture里惰性执行：只收集不运行时
+    不再触发FastAPI应用（及其携带的LLM/K8s客户端）的导入开销；
+    session作用域保证每个pytest进程（或xdist worker）只构建一次。
+    """
+    from fastapi.testclient import TestClient
+    from ..main import app
+
+    with TestClient(app) as c:
+        yield c
+
+@pytest.fixture(autouse=True)
+def test_env(monkeypatch):
+    """统一设置测试环境变量
+
+    用monkeypatch代替模块级的os.environ赋值：每个测试结束后自动还原，
+    xdist并行worker之间也不会通过进程全局环境互相影响。
+    """
+    monkeypatch.setenv("TESTING", "true")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("LOG_LEVEL", "DEBUG")
+    monkeypatch.setenv("KUBERNETES_NAMESPACE", "test-namespace")
+    monkeypatch.setenv("KUBERNETES_CONFIG_PATH", "/root/.kube/config")
@@ -0,0 +1,79 @@
+"""测试用的轻量Kubernetes对象桩
+
+MagicMock每次属性访问都会自动生成子mock，构造一个带十几个属性的Pod
+对象开销可观；slots数据类只做纯属性存储，构造成本低一个数量级，
+且访问未定义属性会直接报错，比mock的静默自动生成更容易暴露笔误。
+字段只覆盖测试实际访问到的部分，默认None。
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+@dataclass(slots=True)
+class FakeMeta:
+    name: Optional[str] = None
+    namespace: Optional[str] = None
+    labels: Optional[Dict[str, str]] = None
+
+@dataclass(slots=True)
+class FakeRunning:
+    started_at: Optional[str] = None
+
+@dataclass(slots=True)
+class FakeWaiting:
+    reason: Optional[str] = None
+    message: Optional[str] = None
+
+@dataclass(slots=True)
+class FakeTerminated:
+    reason: Optional[str] = None
+    message: Optional[str] = None
+    exit_code: Optional[int] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+@dataclass(slots=True)
+class FakeContainerState:
+    running: Optional[FakeRunning] = None
+    waiting: Optional[FakeWaiting] = None
+    terminated: Optional[FakeTerminated] = None
+
+@dataclass(slots=True)
+class FakeContainerStatus:
+    name: Optional[str] = None
+    ready: bool = False
+    restart_count: int = 0
+    state: Optional[FakeContainerState] = None
+
+@dataclass(slots=True)
+class FakeContainer:
+    name: Optional[str] = None
+    image: Optional[str] = None
+
+@dataclass(slots=True)
+class FakeCondition:
+    type: Optional[str] = None
+    status: Optional[str] = None
+    reason: Optional[str] = None
+    message: Optional[str] = None
+
+@dataclass(slots=True)
+class FakeSpec:
+    containers: List[FakeContainer] = field(default_factory=list)
+
+@dataclass(slots=True)
+class FakeStatus:
+    phase: Optional[str] = None
+    host_ip: Optional[str] = None
+    pod_ip: Optional[str] = None
+    container_statuses: Optional[List[FakeContainerStatus]] = None
+    conditions: Optional[List[FakeCondition]] = None
+
+@dataclass(slots=True)
+class FakePod:
+    metadata: Optional[FakeMeta] = None
+    status: Optional[FakeStatus] = None
+    spec: Optional[FakeSpec] = None
+
+@dataclass(slots=True)
+class FakePodList:
+    items: List[Any] = field(default_factory=list)
@@ -1,16 +1,10 @@
-import pytest
-from fastapi.testclient import TestClient
-from ..main import app
-
-client = TestClient(app)
-
-def test_health_check():
+def test_health_check(client):
     """测试健康检查接口"""
     response = client.get("/api/v1/health")
     assert response.status_code == 200
     assert response.json() == {"status": "healthy"}
 
-def test_query_pod():
+def test_query_pod(client):
     """测试Pod查询接口"""
     response = client.post(
         "/api/v1/query",
@@ -30,4 +24,4 @@ def test_query_pod():
     data = response.json()
     assert "success" in data
     assert "analysis" in data
-    assert "raw_result" in data 
\ No newline at end of file
+    assert "raw_result" in data
@@ -0,0 +1,127 @@
+import asyncio
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from ..core import llm_client
+
+_BATCH_COUNT_RE = re.compile(r"下面是 (\d+) 个")
+
+class _FakeCompletions:
+    """记录调用并按responder生成回复的chat.completions桩"""
+
+    def __init__(self, responder):
+        self.calls = []
+        self._responder = responder
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        content = self._responder(kwargs)
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+class _FakeClient:
+    def __init__(self, responder):
+        self.chat = SimpleNamespace(completions=_FakeCompletions(responder))
+
+def _batch_responder(kwargs):
+    """批量请求按分隔符返回对应数量的回复，单条请求返回固定文案"""
+    user_content = kwargs["messages"][-1]["content"]
+    match = _BATCH_COUNT_RE.search(user_content)
+    if match:
+        n = int(match.group(1))
+        return llm_client._REPLY_SEPARATOR.join(f"回复{i + 1}" for i in range(n))
+    return "单条回复"
+
+@pytest.fixture
+def agent(monkeypatch):
+    """构造agent并隔离模块级回复缓存；压短worker空闲退出时间"""
+    monkeypatch.setattr(llm_client, "_REPLY_WORKER_IDLE", 0.05)
+    llm_client._reply_cache.clear()
+    return llm_client.SuperKubectlAgent()
+
+@pytest.mark.asyncio
+async def test_concurrent_replies_merged_into_one_call(agent):
+    """并发的回复请求应合并为一次LLM调用，且worker空闲后自行退出"""
+    agent.client = _FakeClient(_batch_responder)
+
+    results = await asyncio.gather(*[
+        agent.generate_smart_reply_with_retry_info(
+            f"查询{i}", f"kubectl get pods -{i}", "输出",
+            {"type": "text", "line_count": 1}
+        )
+        for i in range(3)
+    ])
+
+    assert sorted(results) == ["回复1", "回复2", "回复3"]
+    assert len(agent.client.chat.completions.calls) == 1
+
+    # 队列空闲后worker退出并从注册表摘除，不留常驻任务
+    await asyncio.sleep(0.2)
+    assert not llm_client._REPLY_BATCHERS
+
+@pytest.mark.asyncio
+async def test_idle_timeout_race_does_not_strand_request(agent, monkeypatch):
+    """空闲超时与入队竞态时，请求仍须被处理而不是永久挂起"""
+    agent.client = _FakeClient(_batch_responder)
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    future = loop.create_future()
+
+    real_wait_for = asyncio.wait_for
+    raced = False
+
+    async def racing_wait_for(aw, timeout):
+        # 首次等待直接制造竞态：超时取消get()之后、worker恢复之前，
+        # 提交方恰好put_nowait了一个请求
+        nonlocal raced
+        if not raced:
+            raced = True
+            aw.close()
+            queue.put_nowait(("sys", "ctx", "查询", "输出",
+                              {"type": "text", "line_count": 1}, future))
+            raise asyncio.TimeoutError
+        return await real_wait_for(aw, timeout)
+
+    monkeypatch.setattr(asyncio, "wait_for", racing_wait_for)
+    task = loop.create_task(agent._reply_batch_worker(queue, id(loop)))
+
+    reply = await real_wait_for(future, timeout=1)
+    assert reply == "单条回复"
+    # worker处理完残留请求后照常空闲退出
+    await real_wait_for(task, timeout=1)
+
+@pytest.mark.asyncio
+async def test_reply_cache_hit_within_ttl(agent):
+    """相同(查询,命令,输出)在TTL内应直接复用回复，不再调用LLM"""
+    agent.client = _FakeClient(lambda kwargs: "第一次回复")
+    args = ("查询缓存", "kubectl get pods", "输出内容", {"type": "text", "line_count": 1})
+
+    first = await agent.generate_smart_reply_with_retry_info(*args)
+    second = await agent.generate_smart_reply_with_retry_info(*args)
+
+    assert first == second == "第一次回复"
+    assert len(agent.client.chat.completions.calls) == 1
+
+@pytest.mark.asyncio
+async def test_batch_separator_mismatch_falls_back_to_single(agent):
+    """批量回复的分隔数量对不上时应回退为逐个请求"""
+    def responder(kwargs):
+        if _BATCH_COUNT_RE.search(kwargs["messages"][-1]["content"]):
+            return "缺少分隔符的单条内容"
+        return "单条回复"
+
+    agent.client = _FakeClient(responder)
+
+    results = await asyncio.gather(*[
+        agent.generate_smart_reply_with_retry_info(
+            f"回退查询{i}", f"kubectl get svc -{i}", "输出",
+            {"type": "text", "line_count": 1}
+        )
+        for i in range(2)
+    ])
+
+    assert results == ["单条回复", "单条回复"]
+    # 一次失败的批量调用 + 每个请求各一次单独调用
+    assert len(agent.client.chat.completions.calls) == 3
@@ -0,0 +1,38 @@
+import pytest
+
+from ..core import result_formatter
+from ..core.result_formatter import ResultFormatter
+
+# 含数值列、NA字面量、前导零和缺失尾列的典型kubectl表格
+_TABLE_OUTPUT = (
+    "NAME    READY   RESTARTS   VERSION   AGE\n"
+    "pod-a   1/1     0          N/A       007\n"
+    "pod-b   1/2     2          null\n"
+)
+
+def test_pandas_table_path_matches_python_path(monkeypatch):
+    """pandas定宽解析路径必须与纯Python路径逐单元格一致
+
+    回归点：dtype推断会把"2"写成"2.0"、剥掉"007"的前导零，
+    默认NA识别会把"N/A"/"null"清洗成空串。
+    """
+    pytest.importorskip("pandas")
+    formatter = ResultFormatter()
+
+    with_pandas = formatter._format_as_table(_TABLE_OUTPUT)
+
+    monkeypatch.setattr(result_formatter, "HAS_PANDAS", False)
+    pure_python = formatter._format_as_table(_TABLE_OUTPUT)
+
+    assert with_pandas == pure_python
+    # 单元格原样保留：数值不被改写，NA字面量不清洗，缺失尾列补空串
+    assert with_pandas["data"][0] == ["pod-a", "1/1", "0", "N/A", "007"]
+    assert with_pandas["data"][1] == ["pod-b", "1/2", "2", "null", ""]
+
+def test_table_short_rows_padded():
+    """纯Python路径对短行按表头宽度补空串"""
+    formatter = ResultFormatter()
+    result = formatter.format_output(_TABLE_OUTPUT, "table")
+    assert result["type"] == "table"
+    assert result["total_rows"] == 2
+    assert all(len(row) == len(result["headers"]) for row in result["data"])
@@ -3,12 +3,50 @@ import yaml
 from pathlib import Path
 from typing import Dict, Any, List
 
+from . import fastjson
+
+# C实现的安全Loader解析速度远高于纯Python实现，不可用时回退
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+def _to_bool(value):
+    """字符串'true'/'True'归一为布尔值，其余类型原样返回"""
+    if isinstance(value, str):
+        return value.lower() == 'true'
+    return value
+
+def _expand_path(value) -> str:
+    return str(Path(value).expanduser())
+
+class _ConfigValue:
+    """配置项描述符：Config.XXX -> _get_config_value(键路径, 默认值)
+
+    代替逐个手写的classmethod+property组合（该写法3.11起已废弃），
+    每个配置项只声明键路径、默认值和可选的类型转换。
+    """
+    __slots__ = ('key_path', 'default', 'cast')
+
+    def __init__(self, key_path: str, default=None, cast=None):
+        self.key_path = key_path
+        self.default = default
+        self.cast = cast
+
+    def __get__(self, obj, objtype=None):
+        value = objtype._get_config_value(self.key_path, self.default)
+        if self.cast is not None:
+            value = self.cast(value)
+        return value
+
 class Config:
     """统一配置管理类"""
     
     _config_data = None
     _config_file_path = None
-    
+    _flat = None  # 加载时展平的"点分路径 -> 值"索引，查询O(1)
+    _MISSING = object()
+
     @classmethod
     def _load_config(cls):
         """加载配置文件"""
@@ -17,135 +55,102 @@ class Config:
             if cls._config_file_path is None:
                 current_dir = Path(__file__).parent.parent.parent
                 cls._config_file_path = current_dir / "config.yml"
-            
-            # 读取配置文件
+
+            # 快路径：mtime不早于YAML的JSON缓存直接反序列化，
+            # 省去YAML解析（对固定部署配置JSON解析快一个数量级）
+            cache_path = Path(f"{cls._config_file_path}.cache.json")
             try:
-                with open(cls._config_file_path, 'r', encoding='utf-8') as f:
-                    cls._config_data = yaml.safe_load(f)
-            except FileNotFoundError:
-                raise FileNotFoundError(f"配置文件未找到: {cls._config_file_path}")
-            except yaml.YAMLError as e:
-                raise ValueError(f"配置文件格式错误: {e}")
-    
+                if cache_path.stat().st_mtime >= Path(cls._config_file_path).stat().st_mtime:
+                    cls._config_data = fastjson.loads(cache_path.read_bytes())
+            except (OSError, ValueError):
+                cls._config_data = None
+
+            if cls._config_data is None:
+                # 读取配置文件
+                try:
+                    with open(cls._config_file_path, 'r', encoding='utf-8') as f:
+                        cls._config_data = yaml.load(f, Loader=_SafeLoader)
+                except FileNotFoundError:
+                    raise FileNotFoundError(f"配置文件未找到: {cls._config_file_path}")
+                except yaml.YAMLError as e:
+                    raise ValueError(f"配置文件格式错误: {e}")
+
+                # 写缓存失败不影响主流程（只读文件系统、含JSON不可表示类型等）
+                try:
+                    cache_path.write_bytes(fastjson.dumps(cls._config_data))
+                except (OSError, TypeError, ValueError):
+                    pass
+
+            cls._flat = cls._flatten(cls._config_data)
+
+    @staticmethod
+    def _flatten(data) -> dict:
+        """把嵌套配置展平为'点分路径 -> 值'字典
+
+        中间节点（子字典）也作为值保留，get_security_config等整段取用
+        的场景同样一次查到；之后每次取值不再逐层遍历字典树。
+        """
+        flat = {}
+        stack = [("", data if isinstance(data, dict) else {})]
+        while stack:
+            prefix, node = stack.pop()
+            for key, value in node.items():
+                path = f"{prefix}.{key}" if prefix else key
+                flat[path] = value
+                if isinstance(value, dict):
+                    stack.append((path, value))
+        return flat
+
     @classmethod
     def _get_config_value(cls, key_path: str, default=None):
         """获取配置值，支持嵌套键路径如 'app.name'"""
         cls._load_config()
-        
-        keys = key_path.split('.')
-        value = cls._config_data
-        
-        try:
-            for key in keys:
-                value = value[key]
-            
-            # 处理环境变量替换
-            if isinstance(value, str) and value.startswith("${") and value.endswith("}"):
-                env_var = value[2:-1]
-                return os.getenv(env_var, default)
-            
-            return value
-        except (KeyError, TypeError):
+
+        value = cls._flat.get(key_path, cls._MISSING)
+        if value is cls._MISSING:
             # 如果配置不存在，尝试从环境变量获取
             env_key = key_path.upper().replace('.', '_')
             return os.getenv(env_key, default)
+
+        # 处理环境变量替换
+        if isinstance(value, str) and value.startswith("${") and value.endswith("}"):
+            env_var = value[2:-1]
+            return os.getenv(env_var, default)
+
+        return value
     
+    # 各具名配置项：声明为_ConfigValue描述符（键路径+默认值+可选转换），
+    # 取值仍经过_get_config_value，运行期切换配置文件立即生效
     # 基础配置
-    @classmethod
-    @property
-    def APP_NAME(cls):
-        return cls._get_config_value('app.name', 'k8helper')
-    
-    @classmethod
-    @property
-    def VERSION(cls):
-        return cls._get_config_value('app.version', '0.1.0')
-    
-    @classmethod
-    @property
-    def DEBUG(cls):
-        debug_value = cls._get_config_value('app.debug', False)
-        if isinstance(debug_value, str):
-            return debug_value.lower() == 'true'
-        return debug_value
-    
+    APP_NAME = _ConfigValue('app.name', 'k8helper')
+    VERSION = _ConfigValue('app.version', '0.1.0')
+    DEBUG = _ConfigValue('app.debug', False, cast=_to_bool)
+
     # API配置
-    @classmethod
-    @property
-    def API_HOST(cls):
-        return cls._get_config_value('api.host', '0.0.0.0')
-    
-    @classmethod
-    @property
-    def API_PORT(cls):
-        port = cls._get_config_value('api.port', 8080)
-        return int(port)
-    
-    @classmethod
-    @property
-    def API_RELOAD(cls):
-        return cls._get_config_value('api.reload', True)
-    
+    API_HOST = _ConfigValue('api.host', '0.0.0.0')
+    API_PORT = _ConfigValue('api.port', 8080, cast=int)
+    API_RELOAD = _ConfigValue('api.reload', True)
+
     # Kubernetes配置
-    @classmethod
-    @property
-    def KUBE_CONFIG(cls):
-        config_path = cls._get_config_value('kubernetes.config_path', '~/.kube/config')
-        return str(Path(config_path).expanduser())
-    
-    @classmethod
-    @property
-    def KUBE_NAMESPACE(cls):
-        return cls._get_config_value('kubernetes.namespace', 'default')
-    
+    KUBE_CONFIG = _ConfigValue('kubernetes.config_path', '~/.kube/config', cast=_expand_path)
+    KUBE_NAMESPACE = _ConfigValue('kubernetes.namespace', 'default')
+
     # 腾讯云配置
-    @classmethod
-    @property
-    def TENCENT_SECRET_ID(cls):
-        return cls._get_config_value('tencent.secret_id', 'your_secret_id')
-    
-    @classmethod
-    @property
-    def TENCENT_SECRET_KEY(cls):
-        return cls._get_config_value('tencent.secret_key', 'your_secret_key')
-    
-    @classmethod
-    @property
-    def TENCENT_REGION(cls):
-        return cls._get_config_value('tencent.region', 'ap-guangzhou')
-    
+    TENCENT_SECRET_ID = _ConfigValue('tencent.secret_id', 'your_secret_id')
+    TENCENT_SECRET_KEY = _ConfigValue('tencent.secret_key', 'your_secret_key')
+    TENCENT_REGION = _ConfigValue('tencent.region', 'ap-guangzhou')
+
     # LLM配置
-    @classmethod
-    @property
-    def HUNYUAN_API_KEY(cls):
-        return cls._get_config_value('llm.hunyuan.api_key', 'test_key')
-    
-    @classmethod
-    @property
-    def HUNYUAN_SECRET_KEY(cls):
-        return cls._get_config_value('llm.hunyuan.secret_key', 'test_secret')
-    
-    @classmethod
-    @property
-    def OPENAI_API_KEY(cls):
-        return cls._get_config_value('llm.openai.api_key', None)
-    
+    HUNYUAN_API_KEY = _ConfigValue('llm.hunyuan.api_key', 'test_key')
+    HUNYUAN_SECRET_KEY = _ConfigValue('llm.hunyuan.secret_key', 'test_secret')
+    HUNYUAN_TIMEOUT = _ConfigValue('llm.hunyuan.timeout', 60, cast=float)
+    OPENAI_API_KEY = _ConfigValue('llm.openai.api_key', None)
+
     # 日志配置
-    @classmethod
-    @property
-    def LOG_LEVEL(cls):
-        return cls._get_config_value('logging.level', 'INFO')
-    
-    @classmethod
-    @property
-    def LOG_DIR(cls):
-        return cls._get_config_value('logging.log_dir', 'logs')
-    
-    @classmethod
-    @property
-    def LOG_FILE_NAME(cls):
-        return cls._get_config_value('logging.file_name', 'k8helper.log')
-    
+    LOG_LEVEL = _ConfigValue('logging.level', 'INFO')
+    LOG_DIR = _ConfigValue('logging.log_dir', 'logs')
+    LOG_FILE_NAME = _ConfigValue('logging.file_name', 'k8helper.log')
+
     # 安全配置
     @classmethod
     def get_security_config(cls) -> Dict[str, Any]:
@@ -183,7 +188,7 @@ class Config:
     def get_cors_config(cls) -> Dict[str, Any]:
         """获取CORS配置"""
         return cls._get_config_value('api.cors', {
-            'allow_origins': ['*'],
+            'allow_origins': ['http://localhost:8080', 'http://127.0.0.1:8080'],
             'allow_credentials': True,
             'allow_methods': ['*'],
             'allow_headers': ['*']
@@ -250,4 +255,5 @@ class Config:
     def set_config_file_path(cls, path: str):
         """设置配置文件路径"""
         cls._config_file_path = Path(path)
-        cls._config_data = None  # 重置配置数据以便重新加载 
\ No newline at end of file
+        cls._config_data = None  # 重置配置数据以便重新加载
+        cls._flat = None 
\ No newline at end of file
@@ -0,0 +1,30 @@
+import json
+
+# 尝试导入 orjson，如果失败则退回标准库 json
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    orjson = None
+    HAS_ORJSON = False
+
+def dumps(obj) -> bytes:
+    """序列化为UTF-8字节串（orjson直接输出bytes，省去encode步骤）"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+def dumps_str(obj, pretty: bool = False) -> str:
+    """序列化为str（提示词、日志等需要文本的场景）；非pretty时输出紧凑JSON"""
+    if HAS_ORJSON:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(obj, option=option).decode('utf-8')
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+def loads(data):
+    """反序列化JSON字符串或字节串"""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -1,16 +1,44 @@
+import functools
+
 from kubernetes import client, config
 from typing import Dict, Any
 
 class KubernetesClient:
-    def __init__(self):
-        self.v1 = client.CoreV1Api()
-        self.apps_v1 = client.AppsV1Api()
-        self.metrics_api = client.CustomObjectsApi()
+    def __init__(self, v1=None, apps_v1=None, metrics_api=None):
+        """支持注入预构建的API对象（测试传入mock，跳过SDK对象构造）"""
+        if v1 is not None:
+            self.v1 = v1
+        if apps_v1 is not None:
+            self.apps_v1 = apps_v1
+        if metrics_api is not None:
+            self.metrics_api = metrics_api
 
-def init_kubernetes_client() -> KubernetesClient:
-    """初始化 Kubernetes 客户端"""
+    # API对象按需构造并缓存在实例上：大多数调用方只用到其中一两个
+    @functools.cached_property
+    def v1(self):
+        return client.CoreV1Api()
+
+    @functools.cached_property
+    def apps_v1(self):
+        return client.AppsV1Api()
+
+    @functools.cached_property
+    def metrics_api(self):
+        return client.CustomObjectsApi()
+
+@functools.lru_cache(maxsize=1)
+def _load_k8s_config():
+    """加载kubeconfig（SDK全局状态，每进程只需加载一次）"""
     try:
         config.load_incluster_config()
     except config.ConfigException:
         config.load_kube_config()
-    return KubernetesClient() 
\ No newline at end of file
+
+def init_kubernetes_client() -> KubernetesClient:
+    """初始化 Kubernetes 客户端
+
+    每次返回新实例：客户端自身无共享可变状态，测试不需要重置任何
+    进程级单例，并行worker之间也不会互相干扰。
+    """
+    _load_k8s_config()
+    return KubernetesClient()
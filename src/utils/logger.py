@@ -1,4 +1,5 @@
 import logging
+import os
 import sys
 from pathlib import Path
 from logging.handlers import RotatingFileHandler
@@ -22,15 +23,22 @@ def get_logger(name: str) -> logging.Logger:
     console_handler.setFormatter(formatter)
     logger.addHandler(console_handler)
     
+    # 测试环境只保留控制台输出：收集阶段不做目录创建和文件打开，
+    # 并行worker也不会争抢同一个日志文件
+    if os.getenv("TESTING") == "true":
+        return logger
+
     # 文件处理器
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True)
-    
+
+    # delay=True推迟open()到首条日志真正写入时，导入期不占文件描述符
     file_handler = RotatingFileHandler(
         log_dir / "k8helper.log",
         maxBytes=10*1024*1024,  # 10MB
         backupCount=5,
-        encoding='utf-8'
+        encoding='utf-8',
+        delay=True
     )
     file_handler.setFormatter(formatter)
     logger.addHandler(file_handler)
@@ -0,0 +1,46 @@
+#!/bin/bash
+
+# 设置颜色
+GREEN='\033[0;32m'
+BLUE='\033[0;34m'
+NC='\033[0m'
+
+info() { echo -e "${BLUE}[信息]${NC} $1"; }
+
+# 设置工作目录
+cd "$(dirname "$0")"
+
+# 测试环境标记：get_logger据此只挂控制台处理器，不碰日志文件
+export TESTING=true
+
+# 优先使用虚拟环境解释器
+if [ -x "venv/bin/python" ]; then
+    PYTHON="venv/bin/python"
+else
+    PYTHON="python3"
+fi
+
+# report模式：输出全部用例耗时并检查慢测试预算（单用例>0.5秒视为回归）
+if [ "$1" = "report" ]; then
+    shift
+    DURATIONS_OUT=$(mktemp)
+    "$PYTHON" -m pytest src/tests --durations=0 "$@" | tee "$DURATIONS_OUT"
+    STATUS=${PIPESTATUS[0]}  # 取pytest而非tee的退出码，测试失败不能被预算检查掩盖
+    SLOW=$(grep -E '^[0-9]+\.[0-9]+s (call|setup|teardown)' "$DURATIONS_OUT" | awk '$1 + 0 > 0.5')
+    rm -f "$DURATIONS_OUT"
+    if [ -n "$SLOW" ]; then
+        echo -e "${GREEN}[预算]${NC} 以下用例超过0.5秒预算："
+        echo "$SLOW"
+        exit 1
+    fi
+    exit $STATUS
+fi
+
+# 安装了pytest-xdist时按文件粒度并行跑测试，否则串行
+if "$PYTHON" -c "import xdist" 2>/dev/null; then
+    info "检测到pytest-xdist，按CPU核数并行运行测试"
+    exec "$PYTHON" -m pytest src/tests -n auto --dist loadfile "$@"
+else
+    info "未安装pytest-xdist，串行运行测试"
+    exec "$PYTHON" -m pytest src/tests "$@"
+fi